@@ -0,0 +1,186 @@
+"""Gerador de carga: sobe N clientes headless em vários processos contra o server.py.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.loadgen --clients 20 --processes 4 --group-size 5 --rate 5 --duration 10
+
+Cada mensagem leva o instante de envio no texto; o receptor calcula a latência de
+entrega. Ao final são exibidos vazão de envio/entrega e percentis de latência.
+"""
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import grpc
+
+from client import HeadlessChatClient, MAX_GROUP_SIZE
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentile(sorted_values, p):
+    """Percentil pelo método nearest-rank; `sorted_values` precisa estar ordenado."""
+    if not sorted_values: return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def _free_address():
+    import socket
+    s = socket.socket(); s.bind(('127.0.0.1', 0)); port = s.getsockname()[1]; s.close()
+    return f"127.0.0.1:{port}"
+
+
+class _ReceiveStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.received = 0
+        self.latencies_ms = []
+
+    def on_message(self, message):
+        now = time.time_ns()
+        try: sent_ns = int(message.text.split(':', 2)[1])
+        except (IndexError, ValueError): return
+        with self.lock:
+            self.received += 1
+            self.latencies_ms.append((now - sent_ns) / 1e6)
+
+
+def _send_loop(client, rate, duration, size, start_at, totals, totals_lock):
+    interval = 1.0 / rate
+    padding = 'x' * size
+    sent = delivered = expected = 0
+    next_send = start_at
+    end_at = start_at + duration
+    seq = 0
+    while True:
+        now = time.time()
+        if now >= end_at: break
+        if now < next_send: time.sleep(next_send - now); continue
+        peers = client.peer_count()
+        delivered += client.send(f"{seq}:{time.time_ns()}:{padding}")
+        expected += peers; sent += 1; seq += 1
+        next_send += interval
+    with totals_lock:
+        totals['sent'] += sent; totals['delivered'] += delivered; totals['expected'] += expected
+
+
+def _worker(specs, args, barrier, results):
+    stats = _ReceiveStats()
+    totals = {'sent': 0, 'delivered': 0, 'expected': 0, 'join_failures': 0, 'incomplete_membership': 0}
+    clients = []
+    error = None
+    try:
+        for user_id, group_id, group_size in specs:
+            trace_path = os.path.join(args.trace_dir, f"{user_id}.vctr") if args.trace_dir else None
+            c = HeadlessChatClient(user_id, discovery_address=args.server, on_message=stats.on_message, trace_path=trace_path)
+            if c.join(group_id, create=True): clients.append((c, group_size))
+            else: totals['join_failures'] += 1; c.close()
+        barrier.wait(timeout=args.setup_timeout)
+        for c, group_size in clients:
+            if not c.wait_for_peers(group_size - 1, timeout=args.setup_timeout): totals['incomplete_membership'] += 1
+        # O segundo encontro garante que todos conhecem seus peers antes de começar a medir.
+        barrier.wait(timeout=args.setup_timeout)
+        start_at = time.time() + 0.5
+        totals_lock = threading.Lock()
+        threads = [threading.Thread(target=_send_loop, args=(c, args.rate, args.duration, args.message_size, start_at, totals, totals_lock))
+                   for c, _ in clients]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        time.sleep(args.drain)
+    except Exception as e:
+        error = repr(e)
+    finally:
+        for c, _ in clients:
+            try: c.close()
+            except grpc.RpcError: pass
+    with stats.lock:
+        results.put(dict(totals, received=stats.received, latencies_ms=stats.latencies_ms, error=error))
+
+
+def plan_clients(num_clients, group_size, run_id):
+    """Distribui os clientes em grupos de `group_size` (o último pode ficar menor)."""
+    specs = []
+    for i in range(num_clients):
+        g = i // group_size
+        size = min(group_size, num_clients - g * group_size)
+        specs.append((f"carga-{run_id}-c{i}", f"carga-{run_id}-g{g}", size))
+    return specs
+
+
+def summarize(results, duration):
+    lat = sorted(l for r in results for l in r['latencies_ms'])
+    summary = {k: sum(r[k] for r in results) for k in ('sent', 'delivered', 'expected', 'received', 'join_failures', 'incomplete_membership')}
+    summary['send_rate_msgs_s'] = summary['sent'] / duration
+    summary['delivery_rate_msgs_s'] = summary['received'] / duration
+    summary['delivery_ratio'] = summary['delivered'] / summary['expected'] if summary['expected'] else None
+    summary['latency_ms'] = {f"p{p}": percentile(lat, p) for p in PERCENTILES}
+    summary['latency_ms']['max'] = lat[-1] if lat else None
+    summary['errors'] = [r['error'] for r in results if r['error']]
+    return summary
+
+
+def start_server(max_workers: int, address: str = None):
+    """Inicia um server.py num subprocesso e espera ele aceitar conexões. Devolve (processo, endereço)."""
+    address = address or _free_address()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen([sys.executable, os.path.join(root, 'server.py'), address, str(max_workers)],
+                            stdout=subprocess.DEVNULL, cwd=root)
+    with grpc.insecure_channel(address) as channel:
+        grpc.channel_ready_future(channel).result(timeout=10)
+    return proc, address
+
+
+def run(args):
+    server_proc = None
+    if args.server is None:
+        server_proc, args.server = start_server(max(args.clients + 10, 10))
+    try:
+        specs = plan_clients(args.clients, args.group_size, uuid.uuid4().hex[:6])
+        processes = min(args.processes, len(specs))
+        # gRPC não sobrevive a fork com threads ativas: os workers nascem com spawn.
+        ctx = mp.get_context('spawn')
+        barrier = ctx.Barrier(processes)
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(specs[i::processes], args, barrier, results)) for i in range(processes)]
+        for p in procs: p.start()
+        collected = [results.get() for _ in procs]
+        for p in procs: p.join()
+    finally:
+        if server_proc is not None: server_proc.terminate(); server_proc.wait()
+    summary = summarize(collected, args.duration)
+    summary['config'] = {k: getattr(args, k) for k in ('clients', 'processes', 'group_size', 'rate', 'duration', 'message_size')}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de carga para o chat P2P.")
+    parser.add_argument('--server', default=None, help="Endereço de um server.py já rodando. Sem isso, um servidor é iniciado.")
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--group-size', type=int, default=5)
+    parser.add_argument('--rate', type=float, default=5.0, help="Mensagens por segundo, por cliente.")
+    parser.add_argument('--duration', type=float, default=10.0, help="Segundos de envio.")
+    parser.add_argument('--message-size', type=int, default=64, help="Bytes de enchimento por mensagem.")
+    parser.add_argument('--drain', type=float, default=2.0, help="Segundos de espera por entregas atrasadas.")
+    parser.add_argument('--setup-timeout', type=float, default=30.0)
+    parser.add_argument('--json', default=None, help="Grava o resumo em JSON neste arquivo.")
+    parser.add_argument('--trace-dir', default=None, help="Grava um trace causal por cliente neste diretório (ver src/trace_analyzer.py).")
+    args = parser.parse_args(argv)
+    if args.trace_dir: os.makedirs(args.trace_dir, exist_ok=True)
+    if not 1 <= args.group_size <= MAX_GROUP_SIZE: parser.error(f"--group-size deve estar entre 1 e {MAX_GROUP_SIZE}")
+
+    summary = run(args)
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""Suíte de benchmarks ponta a ponta, toda em localhost.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.suite --out resultados.json
+    python -m benchmarks.suite --quick --out novo.json --compare resultados.json
+
+Cada benchmark produz linhas com `params` e `metrics`. Métricas terminadas em `_per_s`
+são "maior é melhor"; as terminadas em `_ms`/`_us` são "menor é melhor". Com `--compare`,
+qualquer métrica que piore mais que `--threshold` em relação ao arquivo de referência é
+listada como regressão e o processo sai com código 1.
+"""
+import argparse
+import json
+import platform
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+import timeit
+import uuid
+
+import grpc
+
+import chat_pb2
+import chat_pb2_grpc
+from benchmarks.loadgen import percentile, start_server
+from client import HeadlessChatClient
+from src.compression import GzipCodec, ZstdCodec, train_dictionary, zstandard
+from src.vector_clock_manager import VectorClockManager
+
+SERVER_WORKERS = 64
+BATCH_SIZE = 1000
+
+
+def _latency_metrics(prefix, values_ms):
+    values_ms = sorted(values_ms)
+    return {f"{prefix}_p50_ms": percentile(values_ms, 50), f"{prefix}_p99_ms": percentile(values_ms, 99)}
+
+
+def bench_enter_leave(address, grid):
+    """Vazão de EnterGroup/LeaveGroup em função do número de grupos e de membros."""
+    rows = []
+    with grpc.insecure_channel(address) as channel:
+        stub = chat_pb2_grpc.DiscoveryServiceStub(channel)
+        for num_groups, members in grid:
+            run_id = uuid.uuid4().hex[:6]
+            groups = [f"bench-{run_id}-g{g}" for g in range(num_groups)]
+            for g in groups: stub.CreateGroup(chat_pb2.CreateGroupRequest(group_id=g))
+            users = [(g, f"u{m}") for g in groups for m in range(members)]
+
+            start = time.perf_counter()
+            for g, u in users:
+                stub.EnterGroup(chat_pb2.EnterGroupRequest(group_id=g, user_id=u, peer_address="127.0.0.1:1"))
+            enter_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for g, u in users:
+                stub.LeaveGroup(chat_pb2.LeaveGroupRequest(group_id=g, user_id=u))
+            leave_s = time.perf_counter() - start
+
+            rows.append({"params": {"groups": num_groups, "members": members},
+                         "metrics": {"enter_per_s": len(users) / enter_s, "leave_per_s": len(users) / leave_s}})
+    return rows
+
+
+def bench_event_fanout(address, subscriber_counts, rounds):
+    """Latência entre o EnterGroup de um novo membro e a chegada do evento em cada inscrito."""
+    rows = []
+    with grpc.insecure_channel(address) as channel:
+        stub = chat_pb2_grpc.DiscoveryServiceStub(channel)
+        for subscribers in subscriber_counts:
+            group = f"bench-{uuid.uuid4().hex[:6]}"
+            stub.CreateGroup(chat_pb2.CreateGroupRequest(group_id=group))
+            arrivals = queue.Queue()
+            streams = []
+            for i in range(subscribers):
+                uid = f"s{i}"
+                stub.EnterGroup(chat_pb2.EnterGroupRequest(group_id=group, user_id=uid, peer_address="127.0.0.1:1"))
+                stream = stub.SubscribeToGroupEvents(chat_pb2.SubscriptionRequest(user_id=uid, group_id=group))
+                streams.append(stream)
+
+                def consume(stream=stream):
+                    try:
+                        for event in stream:
+                            if event.HasField("user_joined") and event.user_joined.user_id.startswith("probe"):
+                                arrivals.put(time.perf_counter())
+                    except grpc.RpcError:
+                        pass
+                threading.Thread(target=consume, daemon=True).start()
+            # Dá tempo para as streams abrirem; os eventos de entrada dos próprios inscritos são ignorados.
+            time.sleep(0.2)
+
+            each_ms, last_ms = [], []
+            for r in range(rounds):
+                probe = f"probe{r}"
+                start = time.perf_counter()
+                stub.EnterGroup(chat_pb2.EnterGroupRequest(group_id=group, user_id=probe, peer_address="127.0.0.1:1"))
+                got = [(arrivals.get(timeout=5) - start) * 1000 for _ in range(subscribers)]
+                each_ms.extend(got); last_ms.append(max(got))
+                stub.LeaveGroup(chat_pb2.LeaveGroupRequest(group_id=group, user_id=probe))
+
+            for stream in streams: stream.cancel()
+            rows.append({"params": {"subscribers": subscribers},
+                         "metrics": {**_latency_metrics("per_subscriber", each_ms), **_latency_metrics("all_subscribers", last_ms)}})
+    return rows
+
+
+def bench_peer_messaging(address, group_sizes, messages):
+    """Latência e vazão de SendDirectMessage de um remetente para o grupo inteiro."""
+    rows = []
+    for size in group_sizes:
+        group = f"bench-{uuid.uuid4().hex[:6]}"
+        pending = {}
+        done = threading.Event()
+        lock = threading.Lock()
+        latencies_ms = []
+
+        def on_message(message):
+            now = time.perf_counter()
+            with lock:
+                entry = pending.get(message.text)
+                if entry is None: return
+                entry[1] -= 1
+                if entry[1] == 0:
+                    latencies_ms.append((now - entry[0]) * 1000)
+                    del pending[message.text]
+                    if not pending: done.set()
+
+        clients = [HeadlessChatClient(f"m{i}", discovery_address=address, on_message=on_message) for i in range(size)]
+        try:
+            clients[0].join(group, create=True)
+            for c in clients[1:]: c.join(group)
+            for c in clients: c.wait_for_peers(size - 1)
+            sender = clients[0]
+
+            start = time.perf_counter()
+            for i in range(messages):
+                text = f"b{i}"
+                with lock: pending[text] = [time.perf_counter(), size - 1]
+                sender.send(text)
+            done.wait(timeout=30)
+            total_s = time.perf_counter() - start
+        finally:
+            for c in clients: c.close()
+        rows.append({"params": {"group_size": size, "messages": messages},
+                     "metrics": {"deliveries_per_s": len(latencies_ms) * (size - 1) / total_s,
+                                 **_latency_metrics("group_delivery", latencies_ms)}})
+    return rows
+
+
+def bench_history_sync(address, depths, paths=("snapshot", "get_history")):
+    """Tempo de entrada de um novo membro em função da profundidade do histórico do provedor.
+
+    `path` é o caminho da entrada: "snapshot" (GetSnapshot) ou "get_history", em que o
+    snapshot falha no joiner e a entrada cai no GetHistory, como diante de um peer antigo.
+    """
+    def no_snapshot(stub):
+        raise ValueError("GetSnapshot desligado pelo benchmark")
+
+    rows = []
+    for depth in depths:
+        for path in paths:
+            group = f"bench-{uuid.uuid4().hex[:6]}"
+            provider = HeadlessChatClient("provider", discovery_address=address, max_history=depth)
+            joiner = HeadlessChatClient("joiner", discovery_address=address, max_history=depth)
+            if path == "get_history": joiner._carregarSnapshot = no_snapshot
+            try:
+                provider.join(group, create=True)
+                with provider.lock:
+                    for i in range(depth):
+                        provider.vcm.increment()
+                        provider.message_history.add(chat_pb2.ChatMessage(
+                            user_id=provider.user_id, text=f"h{i}", vector_clock=provider.vcm.get_clock_proto(), group_id=group,
+                            process_id=provider.process_id))
+                start = time.perf_counter()
+                joiner.join(group)
+                join_ms = (time.perf_counter() - start) * 1000
+                received = len(joiner.message_history)
+                if path == "snapshot": size = {"snapshot_bytes": provider.snapshot().ByteSize()}
+                else: size = {"history_bytes": provider.message_history.nbytes}
+            finally:
+                joiner.close(); provider.close()
+            rows.append({"params": {"depth": depth, "path": path},
+                         "metrics": {"join_ms": join_ms, "messages_per_s": received / join_ms * 1000, **size}})
+    return rows
+
+
+def bench_vector_clock(sizes, number):
+    """Custo por chamada de update, merge_with_max e happened_before."""
+    rows = []
+    for n in sizes:
+        vcm = VectorClockManager(process_id=0, num_processes=n)
+        other = list(range(n))
+        # Relógio fixo para a comparação: nenhum componente encerra o laço antes do fim.
+        cmp_vcm = VectorClockManager(process_id=0, num_processes=n)
+        cmp_vcm.clock = list(other)
+        later = [x + 1 for x in other]
+        metrics = {}
+        for name, fn in (("update", lambda: vcm.update(other)),
+                         ("merge_with_max", lambda: vcm.merge_with_max(other)),
+                         ("happened_before", lambda: cmp_vcm.happened_before(later))):
+            seconds = min(timeit.repeat(fn, number=number, repeat=3))
+            metrics[f"{name}_us"] = seconds / number * 1e6
+
+        # Operações em lote, reportadas por relógio do lote para comparar com as chamadas unitárias.
+        batch = [[(i * 7 + j) % 50 for j in range(n)] for i in range(BATCH_SIZE)]
+        batch_number = max(1, number // BATCH_SIZE)
+        for name, fn in (("merge_loop", lambda: [vcm.merge_with_max(c) for c in batch]),
+                         ("merge_batch", lambda: vcm.merge_batch(batch)),
+                         ("causal_order", lambda: VectorClockManager.causal_order(batch))):
+            seconds = min(timeit.repeat(fn, number=batch_number, repeat=3))
+            metrics[f"{name}_per_clock_us"] = seconds / (batch_number * BATCH_SIZE) * 1e6
+        rows.append({"params": {"num_processes": n}, "metrics": metrics})
+    return rows
+
+
+_WORDS = ("o", "a", "de", "que", "e", "do", "da", "em", "um", "para", "com", "não", "uma", "os", "no", "se", "na", "por",
+          "mais", "mensagem", "grupo", "relógio", "vetorial", "servidor", "peer", "histórico", "ok", "amanhã", "reunião",
+          "código", "teste", "falha", "entrega", "ordem", "causal", "processo", "cliente", "resposta", "pergunta", "bom", "dia")
+
+
+def _chat_text(rng, size):
+    """Texto sintético com vocabulário de chat (texto repetido comprimiria de forma irreal)."""
+    words = []
+    length = 0
+    while length < size:
+        w = rng.choice(_WORDS); words.append(w); length += len(w) + 1
+    return " ".join(words)[:size]
+
+
+def bench_compression(sizes, number):
+    """Razão de compressão e CPU por codec, em função do tamanho do texto.
+
+    A compressão é feita uma vez por mensagem e reaproveitada por todos os destinatários;
+    `ratio` é o que sobra dos bytes por destinatário.
+    """
+    rng = random.Random(42)
+    codecs = [GzipCodec()]
+    if zstandard is not None:
+        codecs.append(ZstdCodec())
+        codecs.append(ZstdCodec(train_dictionary([_chat_text(rng, rng.randint(20, 400)) for _ in range(2000)])))
+    rows = []
+    for size in sizes:
+        samples = [_chat_text(rng, size).encode('utf-8') for _ in range(20)]
+        raw = sum(len(s) for s in samples)
+        for codec in codecs:
+            compressed = [codec.compress(s) for s in samples]
+            reps = max(1, number // len(samples))
+            c_s = min(timeit.repeat(lambda: [codec.compress(s) for s in samples], number=reps, repeat=3))
+            d_s = min(timeit.repeat(lambda: [codec.decompress(c) for c in compressed], number=reps, repeat=3))
+            rows.append({"params": {"size": size, "codec": codec.name.split(':')[0] + ("-dict" if ':' in codec.name else "")},
+                         "metrics": {"ratio": sum(len(c) for c in compressed) / raw,
+                                     "compress_us": c_s / (reps * len(samples)) * 1e6,
+                                     "decompress_us": d_s / (reps * len(samples)) * 1e6}})
+    return rows
+
+
+def bench_fanout(address, group_sizes, messages):
+    """Custo de mandar uma mensagem ao grupo inteiro, com e sem a serialização única.
+
+    Um remetente envia para os outros `group_size - 1` membros pelos canais reais dos peers:
+    `per_peer` chama o stub gerado (uma serialização por peer), `pre_encoded` serializa uma
+    vez e usa os senders de `src/fanout.py`, e `mandar_mensagem` é o `mandarMensagem` completo
+    (relógio, histórico e envio pré-codificado). O texto fica abaixo de `COMPRESS_MIN_BYTES`
+    para que os três caminhos mandem os mesmos bytes.
+    """
+    text = _chat_text(random.Random(0), 256)
+    rows = []
+    for size in group_sizes:
+        group = f"bench-{uuid.uuid4().hex[:6]}"
+        clients = [HeadlessChatClient(f"f{i}", discovery_address=address) for i in range(size)]
+        try:
+            clients[0].join(group, create=True)
+            for c in clients[1:]: c.join(group)
+            for c in clients: c.wait_for_peers(size - 1)
+            sender = clients[0]
+            sender.mandarMensagem("aquecimento")
+            with sender.lock:
+                stubs = list(sender.peers.values())
+                senders = [sender.peer_senders[uid] for uid in sender.peers]
+
+            def batch():
+                # Mensagens novas a cada rodada, para os destinatários não descartarem como duplicata.
+                out = []
+                with sender.lock:
+                    for _ in range(messages):
+                        sender.vcm.increment()
+                        out.append(chat_pb2.ChatMessage(user_id=sender.user_id, text=text, vector_clock=sender.vcm.get_clock_proto(),
+                                                        group_id=group, process_id=sender.process_id))
+                return out
+
+            def per_peer(message):
+                for stub in stubs: stub.SendDirectMessage(message, timeout=1)
+
+            def pre_encoded(message):
+                data = message.SerializeToString()
+                for send in senders: send(data, timeout=1)
+
+            metrics = {}
+            for name, send in (("per_peer", per_peer), ("pre_encoded", pre_encoded),
+                               ("mandar_mensagem", lambda message: sender.mandarMensagem(message.text))):
+                best = None
+                for _ in range(3):
+                    pending = batch()
+                    start = time.perf_counter()
+                    for message in pending: send(message)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                metrics[f"{name}_us"] = best / messages * 1e6
+        finally:
+            for c in clients: c.close()
+        rows.append({"params": {"group_size": size, "messages": messages}, "metrics": metrics})
+    return rows
+
+
+def _metadata():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = None
+    return {"timestamp": time.time(), "git_rev": rev, "python": platform.python_version(),
+            "grpc": grpc.__version__, "platform": platform.platform()}
+
+
+def run(quick: bool = False, only=None):
+    if quick:
+        config = dict(grid=[(1, 5), (4, 5)], subscribers=[2, 8], rounds=10, group_sizes=[2, 5], messages=50,
+                      depths=[10, 100], clock_sizes=[3, 20], number=2000, text_sizes=[128, 1024])
+    else:
+        config = dict(grid=[(1, 5), (1, 20), (4, 5), (4, 20), (16, 20)], subscribers=[2, 5, 10, 19], rounds=50,
+                      group_sizes=[2, 5, 10, 20], messages=200, depths=[10, 100, 1000, 5000], clock_sizes=[3, 20, 100, 1000],
+                      number=20000, text_sizes=[64, 256, 1024, 4096, 16384])
+    benches = {
+        "enter_leave": lambda addr: bench_enter_leave(addr, config["grid"]),
+        "event_fanout": lambda addr: bench_event_fanout(addr, config["subscribers"], config["rounds"]),
+        "peer_messaging": lambda addr: bench_peer_messaging(addr, config["group_sizes"], config["messages"]),
+        "history_sync": lambda addr: bench_history_sync(addr, config["depths"]),
+        "vector_clock": lambda addr: bench_vector_clock(config["clock_sizes"], config["number"]),
+        "fanout": lambda addr: bench_fanout(addr, config["group_sizes"], config["messages"]),
+        "compression": lambda addr: bench_compression(config["text_sizes"], config["number"] // 10),
+    }
+    server_proc, address = start_server(SERVER_WORKERS)
+    results = {}
+    try:
+        for name, bench in benches.items():
+            if only and name not in only: continue
+            print(f"[bench] {name}...", file=sys.stderr, flush=True)
+            results[name] = bench(address)
+    finally:
+        server_proc.terminate(); server_proc.wait()
+    return {"meta": dict(_metadata(), quick=quick), "results": results}
+
+
+def compare(current, baseline, threshold):
+    """Lista as métricas que pioraram mais que `threshold` (fração) em relação à referência."""
+    regressions = []
+    for name, rows in current["results"].items():
+        base_rows = {json.dumps(r["params"], sort_keys=True): r["metrics"] for r in baseline.get("results", {}).get(name, [])}
+        for row in rows:
+            base = base_rows.get(json.dumps(row["params"], sort_keys=True))
+            if not base: continue
+            for metric, value in row["metrics"].items():
+                old = base.get(metric)
+                if value is None or not old: continue
+                change = (old - value) / old if metric.endswith("_per_s") else (value - old) / old
+                if change > threshold:
+                    regressions.append({"benchmark": name, "params": row["params"], "metric": metric,
+                                        "baseline": old, "current": value, "worse_by": change})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks ponta a ponta do chat P2P.")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--quick", action="store_true", help="Grade reduzida, para rodar em poucos segundos.")
+    parser.add_argument("--only", nargs="*", help="Roda só os benchmarks indicados.")
+    parser.add_argument("--compare", default=None, help="Arquivo JSON de referência para detectar regressões.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Piora relativa tolerada antes de acusar regressão.")
+    args = parser.parse_args(argv)
+
+    current = run(quick=args.quick, only=args.only)
+    with open(args.out, "w") as f: json.dump(current, f, indent=2)
+    print(f"Resultados gravados em {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSÃO {r['benchmark']} {r['params']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} "
+                  f"({r['worse_by']:+.0%})")
+        if regressions: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,39 +25,59 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nchat.proto\x12\x0b\x63hat_system\x1a\x1bgoogle/protobuf/empty.proto\"\x1c\n\x0bVectorClock\x12\r\n\x05\x63lock\x18\x01 \x03(\x05\"n\n\x0b\x43hatMessage\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\x12.\n\x0cvector_clock\x18\x03 \x01(\x0b\x32\x18.chat_system.VectorClock\x12\x10\n\x08group_id\x18\x04 \x01(\t\"@\n\x08PeerInfo\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x12\n\nprocess_id\x18\x03 \x01(\x05\"[\n\nGroupEvent\x12,\n\x0buser_joined\x18\x01 \x01(\x0b\x32\x15.chat_system.PeerInfoH\x00\x12\x16\n\x0cuser_left_id\x18\x02 \x01(\tH\x00\x42\x07\n\x05\x65vent\"8\n\x12\x43reateGroupRequest\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"3\n\x0fGenericResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x13\n\x11ListGroupsRequest\"\'\n\x12ListGroupsResponse\x12\x11\n\tgroup_ids\x18\x01 \x03(\t\"^\n\x11\x45nterGroupRequest\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x0f\n\x07user_id\x18\x03 \x01(\t\x12\x14\n\x0cpeer_address\x18\x04 \x01(\t\"\x82\x01\n\x12\x45nterGroupResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1b\n\x13\x61ssigned_process_id\x18\x03 \x01(\x05\x12-\n\x0e\x65xisting_peers\x18\x04 \x03(\x0b\x32\x15.chat_system.PeerInfo\"6\n\x11LeaveGroupRequest\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"8\n\x13SubscriptionRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08group_id\x18\x02 \x01(\t2\xa1\x03\n\x10\x44iscoveryService\x12L\n\x0b\x43reateGroup\x12\x1f.chat_system.CreateGroupRequest\x1a\x1c.chat_system.GenericResponse\x12M\n\nListGroups\x12\x1e.chat_system.ListGroupsRequest\x1a\x1f.chat_system.ListGroupsResponse\x12M\n\nEnterGroup\x12\x1e.chat_system.EnterGroupRequest\x1a\x1f.chat_system.EnterGroupResponse\x12J\n\nLeaveGroup\x12\x1e.chat_system.LeaveGroupRequest\x1a\x1c.chat_system.GenericResponse\x12U\n\x16SubscribeToGroupEvents\x12 .chat_system.SubscriptionRequest\x1a\x17.chat_system.GroupEvent0\x01\x32\x96\x01\n\x0bPeerService\x12\x45\n\x11SendDirectMessage\x12\x18.chat_system.ChatMessage\x1a\x16.google.protobuf.Empty\x12@\n\nGetHistory\x12\x16.google.protobuf.Empty\x1a\x18.chat_system.ChatMessage0\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nchat.proto\x12\x0b\x63hat_system\x1a\x1bgoogle/protobuf/empty.proto\"\x1c\n\x0bVectorClock\x12\r\n\x05\x63lock\x18\x01 \x03(\x05\"\xc6\x01\n\x0b\x43hatMessage\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\x12.\n\x0cvector_clock\x18\x03 \x01(\x0b\x32\x18.chat_system.VectorClock\x12\x10\n\x08group_id\x18\x04 \x01(\t\x12\x17\n\nprocess_id\x18\x05 \x01(\x05H\x00\x88\x01\x01\x12\x17\n\x0f\x63ompressed_text\x18\x06 \x01(\x0c\x12\x15\n\rtext_encoding\x18\x07 \x01(\tB\r\n\x0b_process_id\"Z\n\x08PeerInfo\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x12\n\nprocess_id\x18\x03 \x01(\x05\x12\x18\n\x10\x61\x63\x63\x65pt_encodings\x18\x04 \x03(\t\"[\n\nGroupEvent\x12,\n\x0buser_joined\x18\x01 \x01(\x0b\x32\x15.chat_system.PeerInfoH\x00\x12\x16\n\x0cuser_left_id\x18\x02 \x01(\tH\x00\x42\x07\n\x05\x65vent\"8\n\x12\x43reateGroupRequest\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"3\n\x0fGenericResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x13\n\x11ListGroupsRequest\"\'\n\x12ListGroupsResponse\x12\x11\n\tgroup_ids\x18\x01 \x03(\t\"x\n\x11\x45nterGroupRequest\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\x12\x0f\n\x07user_id\x18\x03 \x01(\t\x12\x14\n\x0cpeer_address\x18\x04 \x01(\t\x12\x18\n\x10\x61\x63\x63\x65pt_encodings\x18\x05 \x03(\t\"\x82\x01\n\x12\x45nterGroupResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x1b\n\x13\x61ssigned_process_id\x18\x03 \x01(\x05\x12-\n\x0e\x65xisting_peers\x18\x04 \x03(\x0b\x32\x15.chat_system.PeerInfo\"6\n\x11LeaveGroupRequest\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\"8\n\x13SubscriptionRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08group_id\x18\x02 \x01(\t\"\x8f\x01\n\x0b\x43ounterStat\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x34\n\x06labels\x18\x02 \x03(\x0b\x32$.chat_system.CounterStat.LabelsEntry\x12\r\n\x05value\x18\x03 \x01(\x01\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xdb\x01\n\rHistogramStat\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x36\n\x06labels\x18\x02 \x03(\x0b\x32&.chat_system.HistogramStat.LabelsEntry\x12\r\n\x05\x63ount\x18\x03 \x01(\x04\x12\x0b\n\x03sum\x18\x04 \x01(\x01\x12\x0b\n\x03max\x18\x05 \x01(\x01\x12\x15\n\rbucket_bounds\x18\x06 \x03(\x01\x12\x15\n\rbucket_counts\x18\x07 \x03(\x04\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xa6\x01\n\rStatsResponse\x12\x0f\n\x07\x65nabled\x18\x01 \x01(\x08\x12*\n\x08\x63ounters\x18\x02 \x03(\x0b\x32\x18.chat_system.CounterStat\x12(\n\x06gauges\x18\x03 \x03(\x0b\x32\x18.chat_system.CounterStat\x12.\n\nhistograms\x18\x04 \x03(\x0b\x32\x1a.chat_system.HistogramStat\"A\n\x0fSnapshotRequest\x12\x14\n\x0cmax_messages\x18\x01 \x01(\r\x12\x18\n\x10\x61\x63\x63\x65pt_encodings\x18\x02 \x03(\t\"9\n\x0b\x43hatHistory\x12*\n\x08messages\x18\x01 \x03(\x0b\x32\x18.chat_system.ChatMessage\"\xbb\x01\n\rGroupSnapshot\x12\x10\n\x08group_id\x18\x01 \x01(\t\x12.\n\x0cvector_clock\x18\x02 \x01(\x0b\x32\x18.chat_system.VectorClock\x12\x0f\n\x07history\x18\x03 \x01(\x0c\x12\x18\n\x10history_encoding\x18\x04 \x01(\t\x12\x15\n\rhistory_count\x18\x05 \x01(\r\x12&\n\x07members\x18\x06 \x03(\x0b\x32\x15.chat_system.PeerInfo2\xe1\x03\n\x10\x44iscoveryService\x12L\n\x0b\x43reateGroup\x12\x1f.chat_system.CreateGroupRequest\x1a\x1c.chat_system.GenericResponse\x12M\n\nListGroups\x12\x1e.chat_system.ListGroupsRequest\x1a\x1f.chat_system.ListGroupsResponse\x12M\n\nEnterGroup\x12\x1e.chat_system.EnterGroupRequest\x1a\x1f.chat_system.EnterGroupResponse\x12J\n\nLeaveGroup\x12\x1e.chat_system.LeaveGroupRequest\x1a\x1c.chat_system.GenericResponse\x12U\n\x16SubscribeToGroupEvents\x12 .chat_system.SubscriptionRequest\x1a\x17.chat_system.GroupEvent0\x01\x12>\n\x08GetStats\x12\x16.google.protobuf.Empty\x1a\x1a.chat_system.StatsResponse2\x9f\x02\n\x0bPeerService\x12\x45\n\x11SendDirectMessage\x12\x18.chat_system.ChatMessage\x1a\x16.google.protobuf.Empty\x12@\n\nGetHistory\x12\x16.google.protobuf.Empty\x1a\x18.chat_system.ChatMessage0\x01\x12>\n\x08GetStats\x12\x16.google.protobuf.Empty\x1a\x1a.chat_system.StatsResponse\x12G\n\x0bGetSnapshot\x12\x1c.chat_system.SnapshotRequest\x1a\x1a.chat_system.GroupSnapshotb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'chat_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_COUNTERSTAT_LABELSENTRY']._loaded_options = None
+  _globals['_COUNTERSTAT_LABELSENTRY']._serialized_options = b'8\001'
+  _globals['_HISTOGRAMSTAT_LABELSENTRY']._loaded_options = None
+  _globals['_HISTOGRAMSTAT_LABELSENTRY']._serialized_options = b'8\001'
   _globals['_VECTORCLOCK']._serialized_start=56
   _globals['_VECTORCLOCK']._serialized_end=84
-  _globals['_CHATMESSAGE']._serialized_start=86
-  _globals['_CHATMESSAGE']._serialized_end=196
-  _globals['_PEERINFO']._serialized_start=198
-  _globals['_PEERINFO']._serialized_end=262
-  _globals['_GROUPEVENT']._serialized_start=264
-  _globals['_GROUPEVENT']._serialized_end=355
-  _globals['_CREATEGROUPREQUEST']._serialized_start=357
-  _globals['_CREATEGROUPREQUEST']._serialized_end=413
-  _globals['_GENERICRESPONSE']._serialized_start=415
-  _globals['_GENERICRESPONSE']._serialized_end=466
-  _globals['_LISTGROUPSREQUEST']._serialized_start=468
-  _globals['_LISTGROUPSREQUEST']._serialized_end=487
-  _globals['_LISTGROUPSRESPONSE']._serialized_start=489
-  _globals['_LISTGROUPSRESPONSE']._serialized_end=528
-  _globals['_ENTERGROUPREQUEST']._serialized_start=530
-  _globals['_ENTERGROUPREQUEST']._serialized_end=624
-  _globals['_ENTERGROUPRESPONSE']._serialized_start=627
-  _globals['_ENTERGROUPRESPONSE']._serialized_end=757
-  _globals['_LEAVEGROUPREQUEST']._serialized_start=759
-  _globals['_LEAVEGROUPREQUEST']._serialized_end=813
-  _globals['_SUBSCRIPTIONREQUEST']._serialized_start=815
-  _globals['_SUBSCRIPTIONREQUEST']._serialized_end=871
-  _globals['_DISCOVERYSERVICE']._serialized_start=874
-  _globals['_DISCOVERYSERVICE']._serialized_end=1291
-  _globals['_PEERSERVICE']._serialized_start=1294
-  _globals['_PEERSERVICE']._serialized_end=1444
+  _globals['_CHATMESSAGE']._serialized_start=87
+  _globals['_CHATMESSAGE']._serialized_end=285
+  _globals['_PEERINFO']._serialized_start=287
+  _globals['_PEERINFO']._serialized_end=377
+  _globals['_GROUPEVENT']._serialized_start=379
+  _globals['_GROUPEVENT']._serialized_end=470
+  _globals['_CREATEGROUPREQUEST']._serialized_start=472
+  _globals['_CREATEGROUPREQUEST']._serialized_end=528
+  _globals['_GENERICRESPONSE']._serialized_start=530
+  _globals['_GENERICRESPONSE']._serialized_end=581
+  _globals['_LISTGROUPSREQUEST']._serialized_start=583
+  _globals['_LISTGROUPSREQUEST']._serialized_end=602
+  _globals['_LISTGROUPSRESPONSE']._serialized_start=604
+  _globals['_LISTGROUPSRESPONSE']._serialized_end=643
+  _globals['_ENTERGROUPREQUEST']._serialized_start=645
+  _globals['_ENTERGROUPREQUEST']._serialized_end=765
+  _globals['_ENTERGROUPRESPONSE']._serialized_start=768
+  _globals['_ENTERGROUPRESPONSE']._serialized_end=898
+  _globals['_LEAVEGROUPREQUEST']._serialized_start=900
+  _globals['_LEAVEGROUPREQUEST']._serialized_end=954
+  _globals['_SUBSCRIPTIONREQUEST']._serialized_start=956
+  _globals['_SUBSCRIPTIONREQUEST']._serialized_end=1012
+  _globals['_COUNTERSTAT']._serialized_start=1015
+  _globals['_COUNTERSTAT']._serialized_end=1158
+  _globals['_COUNTERSTAT_LABELSENTRY']._serialized_start=1113
+  _globals['_COUNTERSTAT_LABELSENTRY']._serialized_end=1158
+  _globals['_HISTOGRAMSTAT']._serialized_start=1161
+  _globals['_HISTOGRAMSTAT']._serialized_end=1380
+  _globals['_HISTOGRAMSTAT_LABELSENTRY']._serialized_start=1113
+  _globals['_HISTOGRAMSTAT_LABELSENTRY']._serialized_end=1158
+  _globals['_STATSRESPONSE']._serialized_start=1383
+  _globals['_STATSRESPONSE']._serialized_end=1549
+  _globals['_SNAPSHOTREQUEST']._serialized_start=1551
+  _globals['_SNAPSHOTREQUEST']._serialized_end=1616
+  _globals['_CHATHISTORY']._serialized_start=1618
+  _globals['_CHATHISTORY']._serialized_end=1675
+  _globals['_GROUPSNAPSHOT']._serialized_start=1678
+  _globals['_GROUPSNAPSHOT']._serialized_end=1865
+  _globals['_DISCOVERYSERVICE']._serialized_start=1868
+  _globals['_DISCOVERYSERVICE']._serialized_end=2349
+  _globals['_PEERSERVICE']._serialized_start=2352
+  _globals['_PEERSERVICE']._serialized_end=2639
 # @@protoc_insertion_point(module_scope)
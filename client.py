@@ -1,16 +1,27 @@
+import logging
 import threading
 import time
 import grpc
 from concurrent import futures
 import socket
-from collections import deque
 import chat_pb2
 import chat_pb2_grpc
 from src.vector_clock_manager import VectorClockManager
+from src.renderer import ConsoleRenderer, NullRenderer, RendererLogHandler
+from src.metrics import MetricsRegistry, instrument_channel, server_interceptors, start_prometheus_server
+from src.causal_trace import TraceWriter, session_path
+from src.history_store import HistoryStore
+from src.fanout import raw_send_direct_message
+from src.compression import COMPRESS_MIN_BYTES, MessageCompressor, make_compressor
+from src.snapshot import SNAPSHOT_MAX_BYTES, SNAPSHOT_MESSAGES, build_snapshot, snapshot_messages
 
 DISCOVERY_SERVER_ADDRESS = 'localhost:50051'
 MAX_GROUP_SIZE = 20
 MAX_HISTORY_SIZE = 50
+# Orçamento opcional de memória do histórico, em bytes serializados (None = só o limite de mensagens).
+MAX_HISTORY_BYTES = None
+# Respostas de GetSnapshot que levam ao GetHistory: peer antigo ou snapshot grande demais.
+SNAPSHOT_FALLBACK_CODES = (grpc.StatusCode.UNIMPLEMENTED, grpc.StatusCode.RESOURCE_EXHAUSTED)
 
 def _get_free_port():
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM); s.bind(('', 0)); port = s.getsockname()[1]; s.close(); return port
@@ -25,51 +36,83 @@ class PeerServicer(chat_pb2_grpc.PeerServiceServicer):
     def __init__(self, client_instance): self.client = client_instance
     
     def SendDirectMessage(self, request: chat_pb2.ChatMessage, context):
-        self.client.receberMensagem(request)
+        try: message = self.client.compression.decode(request)
+        except ValueError as e: context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        self.client.receberMensagem(message)
         return chat_pb2.google_dot_protobuf_dot_empty__pb2.Empty()
 
    
     def GetHistory(self, request, context):
-        print(f"\n[Sistema] Peer {context.peer()} pediu o histórico. Enviando {len(self.client.message_history)} mensagens.")
-        self.client._print_prompt()
         with self.client.lock:
-            for msg in list(self.client.message_history):
-                yield msg
+            history = list(self.client.message_history)
+        self.client.renderer.show(f"[Sistema] Peer {context.peer()} pediu o histórico. Enviando {len(history)} mensagens.")
+        # gzip do próprio gRPC (negociado pelo grpc-accept-encoding), só nas mensagens grandes.
+        context.set_compression(grpc.Compression.Gzip)
+        for message in history:
+            if message.ByteSize() < COMPRESS_MIN_BYTES: context.disable_next_message_compression()
+            yield message
+
+    def GetStats(self, request, context):
+        return self.client.metrics.to_proto()
+
+    def GetSnapshot(self, request, context):
+        snapshot = self.client.snapshot(request.max_messages, request.accept_encodings)
+        self.client.renderer.show(f"[Sistema] Peer {context.peer()} pediu um snapshot. Enviando {snapshot.history_count} mensagens.")
+        return snapshot
 
 class P2PChatClient:
-    def __init__(self, user_id: str, peer_address: str):
+    def __init__(self, user_id: str, peer_address: str, renderer=None, discovery_address: str = DISCOVERY_SERVER_ADDRESS, on_message=None,
+                 max_history: int = MAX_HISTORY_SIZE, metrics: MetricsRegistry = None, trace_path: str = None,
+                 max_history_bytes: int = MAX_HISTORY_BYTES, compression: MessageCompressor = None):
         self.user_id = user_id; self.peer_address = peer_address
-        self.group_id = None; self.process_id = None; self.vcm = None
-        self.discovery_channel = grpc.insecure_channel(DISCOVERY_SERVER_ADDRESS)
-        self.discovery_stub = chat_pb2_grpc.DiscoveryServiceStub(self.discovery_channel)
-        self.peers = {}; self.lock = threading.Lock()
+        self.trace_path = trace_path; self.trace = None
+        self.renderer = renderer if renderer is not None else ConsoleRenderer(prompt_fn=self._prompt_text)
+        self.on_message = on_message
+        self.metrics = metrics or MetricsRegistry()
+        self.compression = compression or MessageCompressor()
+        self.group_id = None; self.group_password = ""; self.process_id = None; self.vcm = None
+        self.discovery_channel = grpc.insecure_channel(discovery_address)
+        self.discovery_stub = chat_pb2_grpc.DiscoveryServiceStub(instrument_channel(self.discovery_channel, self.metrics))
+        self.peers = {}; self.peer_info = {}; self.peer_senders = {}; self.lock = self.metrics.lock(threading.Lock(), 'client_lock')
         self.is_listening_to_events = threading.Event()
         
-        self.message_history = deque(maxlen=MAX_HISTORY_SIZE)
+        self.message_history = HistoryStore(max_messages=max_history, max_bytes=max_history_bytes)
         
-        self.peer_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        self.peer_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), interceptors=server_interceptors(self.metrics))
         chat_pb2_grpc.add_PeerServiceServicer_to_server(PeerServicer(self), self.peer_server)
-        self.peer_server.add_insecure_port(self.peer_address)
+        port = self.peer_server.add_insecure_port(self.peer_address)
+        # Porta 0 pede uma porta livre ao SO; o endereço anunciado precisa da porta real.
+        host, _, requested_port = self.peer_address.rpartition(':')
+        if requested_port == '0': self.peer_address = f"{host}:{port}"
 
     def receberMensagem(self, message: chat_pb2.ChatMessage):
         if self.vcm is None: return
         with self.lock:
+            # Reentrega (ou mensagem já recebida pelo histórico): não conta duas vezes.
+            # Mensagens mais antigas que o histórico retido são contadas à parte.
+            if not self.message_history.add(message):
+                reason = 'stale' if self.message_history.is_stale(message) else 'duplicate'
+                self.metrics.counter('messages_dropped_total', reason=reason).inc(); return
+            if self.trace is not None and message.HasField('process_id'): self.trace.deliver(message.process_id, message.vector_clock.clock)
             self.vcm.update(list(message.vector_clock.clock))
-            self.message_history.append(message)
-        print(f"\n<{message.user_id}> {message.text}")
-        self._print_prompt()
+        self.metrics.counter('messages_received_total').inc()
+        self.renderer.show(f"<{message.user_id}> {message.text}")
+        if self.on_message is not None: self.on_message(message)
         
-    def entrarEmGrupo(self, group_id: str, pw: str = ""):
-        if self.group_id: print("[Sistema] Você já está em um grupo."); return
+    def entrarEmGrupo(self, group_id: str, pw: str = "") -> bool:
+        if self.group_id: self.renderer.show("[Sistema] Você já está em um grupo."); return False
         try:
-            req = chat_pb2.EnterGroupRequest(group_id=group_id, password=pw, user_id=self.user_id, peer_address=self.peer_address)
+            req = chat_pb2.EnterGroupRequest(group_id=group_id, password=pw, user_id=self.user_id, peer_address=self.peer_address,
+                                             accept_encodings=self.compression.accept_encodings)
             res = self.discovery_stub.EnterGroup(req)
-            if not res.success: print(f"[Sistema] Falha: {res.message}"); return
+            if not res.success: self.renderer.show(f"[Sistema] Falha: {res.message}"); return False
 
-            self.group_id = group_id
+            self.group_id = group_id; self.group_password = pw
             self.process_id = res.assigned_process_id
             self.vcm = VectorClockManager(process_id=self.process_id, num_processes=MAX_GROUP_SIZE)
-            print(f"[Sistema] Conectado a '{group_id}' com ID {self.process_id}.")
+            if self.trace_path:
+                self.trace = TraceWriter(session_path(self.trace_path, group_id, self.process_id), MAX_GROUP_SIZE, self.process_id, group_id)
+            self.renderer.show(f"[Sistema] Conectado a '{group_id}' com ID {self.process_id}.")
 
             with self.lock:
                 for peer in res.existing_peers: self.conectarPeer(peer)
@@ -78,66 +121,116 @@ class P2PChatClient:
             if self.peers:
                 history_provider_id = list(self.peers.keys())[0]
                 history_provider_stub = self.peers[history_provider_id]
-                print(f"[Sistema] Pedindo histórico para o peer '{history_provider_id}'...")
+                self.renderer.show(f"[Sistema] Pedindo histórico para o peer '{history_provider_id}'...")
                 try:
-                    history_stream = history_provider_stub.GetHistory(chat_pb2.google_dot_protobuf_dot_empty__pb2.Empty(), timeout=5)
-                    print("\n--- Histórico do Grupo (Recebido de Peer) ---")
-                    for msg in history_stream:
-                        print(f"<{msg.user_id}> {msg.text}")
-                        with self.lock:
-                            self.vcm.merge_with_max(list(msg.vector_clock.clock))
-                            self.message_history.append(msg)
-                    print("--- Fim do Histórico ---\n")
+                    try: history = self._carregarSnapshot(history_provider_stub)
+                    except (grpc.RpcError, ValueError) as e:
+                        if isinstance(e, grpc.RpcError) and e.code() not in SNAPSHOT_FALLBACK_CODES: raise
+                        history = self._carregarHistorico(history_provider_stub)
+                    self.renderer.show("--- Histórico do Grupo (Recebido de Peer) ---")
+                    for msg in history: self.renderer.show(f"<{msg.user_id}> {msg.text}")
+                    self.renderer.show("--- Fim do Histórico ---\n")
                 except grpc.RpcError:
-                    print(f"[Sistema] Falha ao obter histórico de '{history_provider_id}'.")
+                    self.renderer.show(f"[Sistema] Falha ao obter histórico de '{history_provider_id}'.")
+                with self.lock:
+                    if self.trace is not None: self.trace.sync(self.vcm.get_clock_list())
 
             threading.Thread(target=self._listen_for_discovery_events, daemon=True).start()
-        except grpc.RpcError as e: print(f"[Sistema] ERRO: {e.details()}")
+            return True
+        except grpc.RpcError as e: self.renderer.show(f"[Sistema] ERRO: {e.details()}"); return False
+
+    def _carregarSnapshot(self, stub) -> list:
+        """Carrega relógio e últimas mensagens de um peer numa única RPC. Devolve as mensagens novas.
+
+        Os membros do snapshot não são conectados: a lista do servidor de descoberta e os
+        eventos do grupo são a fonte da verdade, e um membro que só o peer ainda conhece já
+        saiu antes do nosso EnterGroup (o evento de saída nunca chegaria para nós).
+        """
+        request = chat_pb2.SnapshotRequest(max_messages=SNAPSHOT_MESSAGES, accept_encodings=self.compression.accept_encodings)
+        snapshot = stub.GetSnapshot(request, timeout=5)
+        messages = snapshot_messages(snapshot, self.compression)
+        with self.lock:
+            # O relógio do peer já cobre todo o histórico dele, inclusive o que não veio no snapshot.
+            self.vcm.merge_with_max(list(snapshot.vector_clock.clock))
+            return self.message_history.extend(messages)
+
+    def _carregarHistorico(self, stub) -> list:
+        """Caminho antigo, para peers sem GetSnapshot: o histórico vem mensagem a mensagem. Devolve as mensagens novas."""
+        history = list(stub.GetHistory(chat_pb2.google_dot_protobuf_dot_empty__pb2.Empty(), timeout=5))
+        with self.lock:
+            # O store põe o histórico em ordem causal; os relógios são fundidos de uma vez.
+            if history: self.vcm.merge_batch([m.vector_clock for m in history])
+            # Mensagens ao vivo que chegaram antes do histórico já foram exibidas; só as novas voltam.
+            return self.message_history.extend(history)
+
+    def snapshot(self, max_messages: int = 0, accept_encodings=None) -> chat_pb2.GroupSnapshot:
+        """Snapshot para um novo membro; o blob usa um codec de `accept_encodings` (padrão: os nossos)."""
+        k = min(max_messages, SNAPSHOT_MESSAGES) if max_messages > 0 else SNAPSHOT_MESSAGES
+        with self.lock:
+            if self.vcm is None: return chat_pb2.GroupSnapshot()
+            members = list(self.peer_info.values())
+            members.append(chat_pb2.PeerInfo(user_id=self.user_id, address=self.peer_address, process_id=self.process_id,
+                                             accept_encodings=self.compression.accept_encodings))
+            group_id, clock, messages = self.group_id, self.vcm.get_clock_list(), self.message_history.tail(k, SNAPSHOT_MAX_BYTES)
+        # Serialização e compressão fora do lock: não seguram as entregas enquanto o snapshot é montado.
+        if accept_encodings is None: accept_encodings = self.compression.accept_encodings
+        return build_snapshot(group_id, clock, messages, members, self.compression, accept_encodings)
 
-    def mandarMensagem(self, text: str):
+    def mandarMensagem(self, text: str) -> int:
+        """Envia a mensagem a todos os peers e devolve quantos a receberam."""
         with self.lock:
             self.vcm.increment()
-            message = chat_pb2.ChatMessage(user_id=self.user_id, text=text, vector_clock=self.vcm.get_clock_proto(), group_id=self.group_id)
-            self.message_history.append(message) 
-            peers_snapshot = list(self.peers.items())
+            message = chat_pb2.ChatMessage(user_id=self.user_id, text=text, vector_clock=self.vcm.get_clock_proto(), group_id=self.group_id,
+                                           process_id=self.process_id)
+            if self.trace is not None: self.trace.send(message.vector_clock.clock)
+            self.message_history.add(message)
+            peers_snapshot = [(uid, self.peer_senders[uid], self.peer_info[uid].accept_encodings) for uid in self.peers]
 
         if not peers_snapshot:
-            print("[Sistema] Nenhum outro participante no grupo para enviar mensagem.")
+            self.renderer.show("[Sistema] Nenhum outro participante no grupo para enviar mensagem.")
         
-        for uid, stub in peers_snapshot:
-            try: stub.SendDirectMessage(message, timeout=1)
+        self.metrics.counter('messages_sent_total').inc()
+        delivered = 0
+        # Uma versão por codec, comprimida e serializada uma vez e reutilizada para todos os peers que a aceitam.
+        encoded = {}
+        for uid, send, accepted in peers_snapshot:
+            codec = self.compression.choose(accepted)
+            if codec not in encoded: encoded[codec] = self.compression.encode(message, codec).SerializeToString()
+            try: send(encoded[codec], timeout=1); delivered += 1
             except grpc.RpcError:
-                print(f"[Sistema] ERRO: Falha ao enviar para {uid}.")
+                self.metrics.counter('send_failures_total', peer=uid).inc()
+                self.renderer.show(f"[Sistema] ERRO: Falha ao enviar para {uid}.")
+        return delivered
         
        
     def começarPeer(self):
-        print(f"[{self.user_id}] Iniciando servidor P2P em {self.peer_address}")
+        self.renderer.show(f"[{self.user_id}] Iniciando servidor P2P em {self.peer_address}")
         self.peer_server.start()
         
     def pararPeer(self):
         self.is_listening_to_events.set()
-        print(f"[{self.user_id}] Parando servidor P2P.")
+        self.renderer.show(f"[{self.user_id}] Parando servidor P2P.")
         self.peer_server.stop(1)
         
-    def _print_prompt(self):
-        prompt = f"[{self.user_id}@{self.group_id or 'Lobby'}]"
-        if self.process_id is not None: prompt = f"[{self.user_id}:{self.process_id}@{self.group_id}]"
-        print(f"{prompt} > ", end='', flush=True)
+    def _prompt_text(self) -> str:
+        if self.process_id is not None: return f"[{self.user_id}:{self.process_id}@{self.group_id}]"
+        return f"[{self.user_id}@{self.group_id or 'Lobby'}]"
         
     def conectarPeer(self, peer_info: chat_pb2.PeerInfo):
         if peer_info.user_id == self.user_id or peer_info.user_id in self.peers:
             return
         
-        print(f"\n[Sistema] Conectando ao peer '{peer_info.user_id}'...")
-        self._print_prompt()
-        channel = grpc.insecure_channel(peer_info.address)
+        self.renderer.show(f"[Sistema] Conectando ao peer '{peer_info.user_id}'...")
+        channel = instrument_channel(grpc.insecure_channel(peer_info.address), self.metrics)
         self.peers[peer_info.user_id] = chat_pb2_grpc.PeerServiceStub(channel)
+        self.peer_senders[peer_info.user_id] = raw_send_direct_message(channel)
+        self.peer_info[peer_info.user_id] = peer_info
         
     def desconectarPeer(self, user_id: str):
         if user_id in self.peers:
-            print(f"\n[Sistema] Peer '{user_id}' saiu.")
-            self._print_prompt()
+            self.renderer.show(f"[Sistema] Peer '{user_id}' saiu.")
             del self.peers[user_id]
+            self.peer_info.pop(user_id, None); self.peer_senders.pop(user_id, None)
             
             
     def _listen_for_discovery_events(self):
@@ -152,27 +245,41 @@ class P2PChatClient:
                         self.conectarPeer(event.user_joined)
                     elif event.HasField("user_left_id"):
                         self.desconectarPeer(event.user_left_id)
-        except grpc.RpcError:
-            print("\n[Sistema] Conexão com o servidor perdida.")
-            self._print_prompt()
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED and not self.is_listening_to_events.is_set():
+                self._reentrarGrupo()
+            else:
+                self.renderer.show("[Sistema] Conexão com o servidor perdida.")
+
+    def _reentrarGrupo(self):
+        """O servidor nos tirou do grupo por não consumirmos os eventos a tempo: a visão de
+        membros pode ter ficado incompleta, então o estado é refeito com uma nova entrada."""
+        group_id, pw = self.group_id, self.group_password
+        self.renderer.show(f"[Sistema] Eventos do grupo '{group_id}' atrasaram demais; entrando de novo.")
+        self.metrics.counter('group_rejoins_total').inc()
+        self._limparGrupo()
+        self.entrarEmGrupo(group_id, pw)
             
             
-    def criarGrupo(self, group_id: str, pw: str = ""):
+    def criarGrupo(self, group_id: str, pw: str = "") -> bool:
         try:
-            print(f"[Sistema] {self.discovery_stub.CreateGroup(chat_pb2.CreateGroupRequest(group_id=group_id, password=pw)).message}")
+            res = self.discovery_stub.CreateGroup(chat_pb2.CreateGroupRequest(group_id=group_id, password=pw))
+            self.renderer.show(f"[Sistema] {res.message}")
+            return res.success
         except grpc.RpcError as e:
-            print(f"[Sistema] ERRO: {e.details()}")
+            self.renderer.show(f"[Sistema] ERRO: {e.details()}")
+            return False
             
             
     def listar_grupos(self):
         try:
             res = self.discovery_stub.ListGroups(chat_pb2.ListGroupsRequest())
             if not res.group_ids:
-                print("[Sistema] Nenhum grupo disponível.")
+                self.renderer.show("[Sistema] Nenhum grupo disponível.")
                 return
-            print("[Sistema] Grupos disponíveis:")
-            [print(f"  - {gid}") for gid in res.group_ids]
-        except grpc.RpcError as e: print(f"[Sistema] ERRO: {e.details()}")
+            self.renderer.show("[Sistema] Grupos disponíveis:")
+            [self.renderer.show(f"  - {gid}") for gid in res.group_ids]
+        except grpc.RpcError as e: self.renderer.show(f"[Sistema] ERRO: {e.details()}")
         
         
     def sair_grupo(self):
@@ -180,32 +287,38 @@ class P2PChatClient:
         try: self.discovery_stub.LeaveGroup(chat_pb2.LeaveGroupRequest(group_id=self.group_id, user_id=self.user_id))
         except grpc.RpcError: pass 
         finally:
-            self.is_listening_to_events.set()
-            print(f"[Sistema] Você saiu do grupo '{self.group_id}'.")
-            self.group_id = None; self.process_id = None; self.vcm = None; self.peers.clear()
+            self.renderer.show(f"[Sistema] Você saiu do grupo '{self.group_id}'.")
+            self._limparGrupo()
+
+    def _limparGrupo(self):
+        self.is_listening_to_events.set()
+        with self.lock:
+            self.group_id = None; self.group_password = ""; self.process_id = None; self.vcm = None; self.peers.clear(); self.peer_info.clear(); self.peer_senders.clear()
             self.message_history.clear()
+            if self.trace is not None: self.trace.close(); self.trace = None
             
             
     def ajuda(self):
-        print("\n--- Comandos ---")
+        self.renderer.show("\n--- Comandos ---")
         if self.group_id:
-            print("/sairgrupo- Sai do grupo atual.")
-            print("Qualquer outro texto- Envia uma mensagem.")
+            self.renderer.show("/sairgrupo- Sai do grupo atual.")
+            self.renderer.show("Qualquer outro texto- Envia uma mensagem.")
         else:
-            print("/criar <grupo> [senha] - Cria um novo grupo.")
-            print("/listagrupos            - Lista os grupos.")
-            print("/entrar <grupo> [senha] - Entra em um grupo.")
-            print("/ajuda                  - Mostra esta ajuda.")
-            print("sair                    - Encerra o cliente.")
-            print("------------------\n")
+            self.renderer.show("/criar <grupo> [senha] - Cria um novo grupo.")
+            self.renderer.show("/listagrupos            - Lista os grupos.")
+            self.renderer.show("/entrar <grupo> [senha] - Entra em um grupo.")
+            self.renderer.show("/ajuda                  - Mostra esta ajuda.")
+            self.renderer.show("sair                    - Encerra o cliente.")
+            self.renderer.show("------------------\n")
             
             
     def começarChat(self):
+        self.renderer.start()
         server_thread = threading.Thread(target=self.começarPeer, daemon=True); server_thread.start()
-        time.sleep(1); print("Bem-vindo ao Chat P2P!"); self.ajuda()
+        time.sleep(1); self.renderer.show("Bem-vindo ao Chat P2P!"); self.ajuda()
         try:
             while True:
-                self._print_prompt(); cmd = input()
+                self.renderer.prompt(); cmd = input()
                 if not cmd: continue
                 if cmd.lower() == 'sair': break
                 elif cmd.lower() == '/ajuda': self.ajuda()
@@ -221,15 +334,70 @@ class P2PChatClient:
                     elif cmd.startswith('/entrar '):
                         parts = cmd.split(maxsplit=2)
                         self.entrarEmGrupo(parts[1], parts[2] if len(parts) > 2 else "")
-                    else: print("[Sistema] Comando inválido no lobby.")
+                    else: self.renderer.show("[Sistema] Comando inválido no lobby.")
                     
-        except (KeyboardInterrupt, EOFError): print("\nEncerrando...")
-        finally: self.sair_grupo(); self.pararPeer()
+        except (KeyboardInterrupt, EOFError): self.renderer.show("\nEncerrando...")
+        finally: self.sair_grupo(); self.pararPeer(); self.renderer.flush(); self.renderer.stop()
+
+
+class HeadlessChatClient(P2PChatClient):
+    """API programática do cliente, sem nenhuma E/S de terminal.
+
+    Pensada para testes de carga e automação: `join`/`send`/`leave` devolvem o resultado
+    em vez de imprimir, e cada mensagem recebida é entregue ao callback `on_message`.
+    """
+
+    def __init__(self, user_id: str, discovery_address: str = DISCOVERY_SERVER_ADDRESS, host: str = '127.0.0.1', on_message=None,
+                 max_history: int = MAX_HISTORY_SIZE, metrics: MetricsRegistry = None, trace_path: str = None,
+                 max_history_bytes: int = MAX_HISTORY_BYTES, compression: MessageCompressor = None):
+        super().__init__(user_id, f"{host}:0", renderer=NullRenderer(), discovery_address=discovery_address, on_message=on_message,
+                         max_history=max_history, metrics=metrics, trace_path=trace_path, max_history_bytes=max_history_bytes,
+                         compression=compression)
+        self.peer_server.start()
+
+    def join(self, group_id: str, password: str = "", create: bool = False) -> bool:
+        if create: self.criarGrupo(group_id, password)
+        return self.entrarEmGrupo(group_id, password)
+
+    def send(self, text: str) -> int:
+        if not self.group_id: raise RuntimeError("Cliente não está em um grupo.")
+        return self.mandarMensagem(text)
+
+    def leave(self):
+        self.sair_grupo()
+
+    def peer_count(self) -> int:
+        with self.lock: return len(self.peers)
+
+    def wait_for_peers(self, count: int, timeout: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while self.peer_count() < count:
+            if time.monotonic() >= deadline: return False
+            time.sleep(0.05)
+        return True
+
+    def close(self):
+        self.sair_grupo(); self.pararPeer()
+        self.discovery_channel.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
 
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 2: print("Uso: python peer_client.py <user_id>"); sys.exit(1)
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    if len(args) != 1: print("Uso: python client.py <user_id> [--quiet] [--trace-relogio] [--metrics] [--metrics-port=N] [--trace=arquivo]"
+                            " [--compress=zstd,gzip|none] [--zstd-dict=arquivo]"); sys.exit(1)
     
-    client = P2PChatClient(user_id=sys.argv[1], peer_address=f"{_get_local_ip()}:{_get_free_port()}")
+    renderer = NullRenderer() if 'quiet' in flags else None
+    metrics = MetricsRegistry(enabled='metrics' in flags or bool(flags.get('metrics-port')))
+    client = P2PChatClient(user_id=args[0], peer_address=f"{_get_local_ip()}:{_get_free_port()}", renderer=renderer, metrics=metrics,
+                           trace_path=flags.get('trace') or None,
+                           compression=make_compressor(flags.get('compress') or None, flags.get('zstd-dict') or None))
+    if flags.get('metrics-port'): start_prometheus_server(metrics, int(flags['metrics-port']))
+    clock_log = logging.getLogger('src.vector_clock_manager')
+    clock_log.addHandler(RendererLogHandler(client.renderer))
+    if 'trace-relogio' in flags: clock_log.setLevel(logging.DEBUG)
     client.começarChat()
\ No newline at end of file
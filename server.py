@@ -6,16 +6,24 @@ import chat_pb2_grpc
 import queue
 import time
 from collections import deque
+from src.metrics import MetricsRegistry, server_interceptors, start_prometheus_server
+from src.fanout import add_discovery_service
 
 MAX_GROUP_SIZE = 20
+SUBSCRIBER_QUEUE_SIZE = 100
+SERVER_ADDRESS = 'localhost:50051'
+# Marca posta na fila de um inscrito removido por não dar conta dos eventos.
+EVICTED = object()
+MAX_WORKERS = 10
 
 class GroupInfo:
-    def __init__(self, group_id, password=None):
+    def __init__(self, group_id, password=None, metrics: MetricsRegistry = None):
         self.group_id = group_id
         self.password = password
         self.participants = {}
         self.subscribers = {}
-        self.lock = threading.RLock()
+        self.metrics = metrics or MetricsRegistry()
+        self.lock = self.metrics.lock(threading.RLock(), 'group_lock', group=group_id)
         self.available_slots = list(range(MAX_GROUP_SIZE))
       
     def assign_slot(self):
@@ -42,26 +50,64 @@ class GroupInfo:
         
         
     def add_subscriber(self, user_id: str, event_queue: queue.Queue):
-        with self.lock: self.subscribers[user_id] = event_queue
+        with self.lock:
+            self.subscribers[user_id] = event_queue
+            self.metrics.register_gauge('subscriber_queue_depth', event_queue.qsize, group=self.group_id, user=user_id)
+        
+        
+    def get_or_add_subscriber(self, user_id: str) -> queue.Queue:
+        with self.lock:
+            if user_id not in self.subscribers: self.add_subscriber(user_id, queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+            return self.subscribers[user_id]
         
         
-    def remove_subscriber(self, user_id: str):
+    def remove_subscriber(self, user_id: str, marker=None):
+        """Fecha a fila do inscrito; a stream termina ao ler `marker` (None = saída normal)."""
         with self.lock:
             if user_id in self.subscribers:
-                self.subscribers[user_id].put(None)
-                del self.subscribers[user_id]
+                q = self.subscribers.pop(user_id)
+                self.metrics.unregister_gauge('subscriber_queue_depth', group=self.group_id, user=user_id)
+                # Fila cheia: descarta um evento para o sinal de fim caber sem bloquear o grupo.
+                try: q.put_nowait(marker)
+                except queue.Full:
+                    try: q.get_nowait()
+                    except queue.Empty: pass
+                    q.put_nowait(marker)
+
+
+    def evict_subscriber(self, user_id: str):
+        """Tira do grupo um membro cuja fila encheu.
+
+        Perder um evento de entrada/saída deixaria a visão de membros dele errada para
+        sempre; em vez disso ele sai do grupo (os outros recebem user_left_id) e a stream
+        dele termina com RESOURCE_EXHAUSTED, para que o cliente entre de novo.
+        """
+        with self.lock:
+            self.metrics.counter('subscribers_evicted_total', group=self.group_id).inc()
+            self.remove_subscriber(user_id, EVICTED)
+            if self.remove_participant(user_id) != -1:
+                self.broadcast_event(chat_pb2.GroupEvent(user_left_id=user_id), exclude_user_id=user_id)
+            print(f"Usuário '{user_id}' removido do grupo '{self.group_id}': fila de eventos cheia.")
                 
                 
     def broadcast_event(self, event: chat_pb2.GroupEvent, exclude_user_id: str = None):
+        # Serializado uma vez só; as streams dos inscritos enviam os bytes como estão (ver src/fanout.py).
+        event = event.SerializeToString()
         with self.lock:
+            overflowed = []
             for uid, q in self.subscribers.items():
-                if uid != exclude_user_id: q.put(event)
+                if uid == exclude_user_id: continue
+                # Um inscrito parado não pode travar o grupo inteiro: com a fila cheia ele é removido.
+                try: q.put_nowait(event)
+                except queue.Full: overflowed.append(uid)
+            for uid in overflowed: self.evict_subscriber(uid)
 
 
 class DiscoveryServiceServicer(chat_pb2_grpc.DiscoveryServiceServicer):
-    def __init__(self):
+    def __init__(self, metrics: MetricsRegistry = None):
         self.groups = {}
-        self.lock = threading.RLock()
+        self.metrics = metrics or MetricsRegistry()
+        self.lock = self.metrics.lock(threading.RLock(), 'groups_lock')
         print("Servidor de Descoberta inicializado.")
 
 
@@ -75,9 +121,12 @@ class DiscoveryServiceServicer(chat_pb2_grpc.DiscoveryServiceServicer):
             process_id = group.assign_slot()
             if process_id == -1: return chat_pb2.EnterGroupResponse(success=False, message="Grupo está cheio.")
 
-            peer_info = chat_pb2.PeerInfo(user_id=request.user_id, address=request.peer_address, process_id=process_id)
+            peer_info = chat_pb2.PeerInfo(user_id=request.user_id, address=request.peer_address, process_id=process_id,
+                                          accept_encodings=request.accept_encodings)
             group.broadcast_event(chat_pb2.GroupEvent(user_joined=peer_info), exclude_user_id=request.user_id)
             group.add_participant(peer_info)
+            # A fila nasce na entrada: eventos anteriores ao SubscribeToGroupEvents não se perdem.
+            group.get_or_add_subscriber(request.user_id)
 
             print(f"Usuário '{request.user_id}' (slot {process_id}) entrou no grupo '{request.group_id}'")
             return chat_pb2.EnterGroupResponse(
@@ -89,7 +138,7 @@ class DiscoveryServiceServicer(chat_pb2_grpc.DiscoveryServiceServicer):
         with self.lock:
             if request.group_id in self.groups:
                 return chat_pb2.GenericResponse(success=False, message="Grupo já existe.")
-            self.groups[request.group_id] = GroupInfo(request.group_id, request.password)
+            self.groups[request.group_id] = GroupInfo(request.group_id, request.password, self.metrics)
         return chat_pb2.GenericResponse(success=True, message="Grupo criado com sucesso.")
     
     
@@ -107,6 +156,7 @@ class DiscoveryServiceServicer(chat_pb2_grpc.DiscoveryServiceServicer):
         slot_released = group.remove_participant(request.user_id)
         if slot_released != -1:
             group.broadcast_event(chat_pb2.GroupEvent(user_left_id=request.user_id), exclude_user_id=request.user_id)
+            group.remove_subscriber(request.user_id)
             
             print(f"Usuário '{request.user_id}' (slot {slot_released}) saiu.")
             
@@ -116,27 +166,44 @@ class DiscoveryServiceServicer(chat_pb2_grpc.DiscoveryServiceServicer):
     def SubscribeToGroupEvents(self, request, context):
         with self.lock: group = self.groups.get(request.group_id)
         if not group: context.abort(grpc.StatusCode.NOT_FOUND, "Grupo não encontrado.")
-        event_queue = queue.Queue(maxsize=100)
-        group.add_subscriber(request.user_id, event_queue)
+        event_queue = group.get_or_add_subscriber(request.user_id)
         def on_disconnect():
+            # Só sai do grupo se a fila ainda for desta stream: depois de um LeaveGroup ou de uma
+            # remoção por fila cheia o membro pode já ter entrado de novo, com outra fila.
+            with group.lock: current = group.subscribers.get(request.user_id) is event_queue
+            if not current: return
             self.LeaveGroup(chat_pb2.LeaveGroupRequest(group_id=request.group_id, user_id=request.user_id), None)
             group.remove_subscriber(request.user_id)
         context.add_callback(on_disconnect)
         try:
             while True:
                 event = event_queue.get()
+                if event is EVICTED: context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Fila de eventos cheia; entre no grupo de novo.")
                 if event is None or not context.is_active(): break
                 yield event
         except (grpc.RpcError, queue.Empty): pass
 
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    chat_pb2_grpc.add_DiscoveryServiceServicer_to_server(DiscoveryServiceServicer(), server)
-    server.add_insecure_port('localhost:50051')
+    def GetStats(self, request, context):
+        return self.metrics.to_proto()
+
+
+def serve(address: str = SERVER_ADDRESS, max_workers: int = MAX_WORKERS, metrics: bool = False, metrics_port: int = None):
+    registry = MetricsRegistry(enabled=metrics or metrics_port is not None)
+    # Cada SubscribeToGroupEvents ocupa uma thread do pool enquanto o cliente estiver no grupo.
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), interceptors=server_interceptors(registry))
+    add_discovery_service(DiscoveryServiceServicer(registry), server)
+    server.add_insecure_port(address)
     server.start()
-    print("Servidor de Descoberta rodando em localhost:50051.")
+    print(f"Servidor de Descoberta rodando em {address}.")
+    if metrics_port is not None:
+        start_prometheus_server(registry, metrics_port)
+        print(f"Métricas Prometheus em http://127.0.0.1:{metrics_port}/metrics")
     server.wait_for_termination()
 
 if __name__ == "__main__":
-    serve()
\ No newline at end of file
+    import sys
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = dict(a[2:].partition('=')[::2] for a in sys.argv[1:] if a.startswith('--'))
+    serve(args[0] if len(args) > 0 else SERVER_ADDRESS, int(args[1]) if len(args) > 1 else MAX_WORKERS,
+          metrics='metrics' in flags, metrics_port=int(flags['metrics-port']) if flags.get('metrics-port') else None)
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import re
+import struct
+import threading
+import time
+
+# Formato binário do trace (little-endian):
+#   cabeçalho: magic b'VCTR', versão (u8), 1 byte livre, num_processes (u16),
+#              tamanho do group_id (u16) seguido do group_id em UTF-8
+#   registro:  tipo (u8), processo que gravou (u8), remetente (u8), instante em ns (i64),
+#              relógio vetorial (num_processes x u32)
+# Todos os registros têm o mesmo tamanho, então o analisador lê o arquivo como um array.
+MAGIC = b'VCTR'
+VERSION = 1
+HEADER = struct.Struct('<4sBxHH')
+
+SEND = 0
+DELIVER = 1
+# Relógio após carregar histórico/snapshot: tudo o que ele cobre conta como entregue.
+SYNC = 2
+
+
+def session_path(path: str, group_id: str, process_id: int) -> str:
+    """Arquivo de trace de uma entrada no grupo: `base-<grupo>-p<id>.vctr`, com sufixo numérico
+    se já existir, para que sair e voltar ao grupo não sobrescreva a sessão anterior."""
+    root, ext = os.path.splitext(path)
+    ext = ext or '.vctr'
+    group = re.sub(r'[^\w.-]', '_', group_id)
+    base = f"{root}-{group}-p{process_id}"
+    candidate, n = f"{base}{ext}", 1
+    while os.path.exists(candidate):
+        n += 1; candidate = f"{base}-{n}{ext}"
+    return candidate
+
+
+def record_struct(num_processes: int) -> struct.Struct:
+    return struct.Struct(f'<BBBq{num_processes}I')
+
+
+class TraceWriter:
+    """Grava envios e entregas de um processo, cada um com o relógio vetorial da mensagem."""
+
+    def __init__(self, path: str, num_processes: int, recorder: int, group_id: str = ""):
+        self.num_processes = num_processes
+        self.recorder = recorder
+        self._record = record_struct(num_processes)
+        self._lock = threading.Lock()
+        # 'x': nunca sobrescreve um trace existente.
+        self._file = open(path, 'xb', buffering=1 << 16)
+        group = group_id.encode('utf-8')
+        self._file.write(HEADER.pack(MAGIC, VERSION, num_processes, len(group)) + group)
+
+    def _write(self, kind: int, sender: int, clock):
+        n = self.num_processes
+        clock = list(clock[:n]) + [0] * (n - len(clock))
+        data = self._record.pack(kind, self.recorder, sender, time.time_ns(), *clock)
+        with self._lock:
+            if self._file is not None: self._file.write(data)
+
+    def send(self, clock): self._write(SEND, self.recorder, clock)
+    def deliver(self, sender: int, clock): self._write(DELIVER, sender, clock)
+    def sync(self, clock): self._write(SYNC, self.recorder, clock)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None: self._file.close(); self._file = None
+
+
+def read_header(path: str):
+    """Valida o cabeçalho e devolve (num_processes, group_id, tamanho do cabeçalho)."""
+    with open(path, 'rb') as f:
+        magic, version, num_processes, group_len = HEADER.unpack(f.read(HEADER.size))
+        group_id = f.read(group_len).decode('utf-8')
+    if magic != MAGIC: raise ValueError(f"{path}: não é um trace de relógios vetoriais")
+    if version != VERSION: raise ValueError(f"{path}: versão de trace não suportada ({version})")
+    return num_processes, group_id, HEADER.size + group_len
@@ -0,0 +1,177 @@
+"""Compressão do texto das mensagens entre peers.
+
+O remetente comprime o texto de uma mensagem grande uma única vez por codec, e a mesma
+versão comprimida vai para todos os peers que aceitam esse codec; textos abaixo de
+`COMPRESS_MIN_BYTES` seguem sem compressão. O blob de histórico do GetSnapshot usa os
+mesmos codecs e o mesmo limite. Cada cliente anuncia ao servidor de
+descoberta os codecs que sabe ler (`accept_encodings`), e o servidor repassa a lista no
+PeerInfo aos outros membros.
+
+Codecs:
+    gzip        sempre disponível
+    zstd        requer `pip install zstandard`
+    zstd:<id>   zstd com dicionário treinado; só é usado entre peers que carregaram o
+                mesmo dicionário (o id vem do próprio dicionário)
+
+Treinar um dicionário com amostras de mensagens (uma por linha):
+    python -m src.compression train mensagens.txt chat.dict
+"""
+import argparse
+import threading
+import zlib
+
+import chat_pb2
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Abaixo disso o cabeçalho do codec e a CPU não compensam o que se economiza.
+COMPRESS_MIN_BYTES = 512
+DICT_SIZE = 16 * 1024
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        c = zlib.compressobj(self.level, zlib.DEFLATED, 31)   # wbits 31: formato gzip
+        return c.compress(data) + c.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data, 31)
+
+
+class ZstdCodec:
+    def __init__(self, dictionary: bytes = None, level: int = 3):
+        if zstandard is None: raise RuntimeError("O codec zstd requer `pip install zstandard`.")
+        self._dict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self.name = f"zstd:{self._dict.dict_id()}" if self._dict is not None else "zstd"
+        self.level = level
+        # Compressores zstd não são thread-safe: um par por thread.
+        self._local = threading.local()
+
+    def _pair(self):
+        pair = getattr(self._local, 'pair', None)
+        if pair is None:
+            kwargs = {'dict_data': self._dict} if self._dict is not None else {}
+            pair = self._local.pair = (zstandard.ZstdCompressor(level=self.level, **kwargs), zstandard.ZstdDecompressor(**kwargs))
+        return pair
+
+    def compress(self, data: bytes) -> bytes: return self._pair()[0].compress(data)
+    def decompress(self, data: bytes) -> bytes: return self._pair()[1].decompress(data)
+
+
+def available_codecs(dictionary: bytes = None) -> list:
+    """Codecs suportados nesta instalação, do preferido ao menos preferido."""
+    codecs = []
+    if zstandard is not None:
+        if dictionary: codecs.append(ZstdCodec(dictionary))
+        codecs.append(ZstdCodec())
+    codecs.append(GzipCodec())
+    return codecs
+
+
+class MessageCompressor:
+    """Escolhe o codec de cada peer e comprime/descomprime o texto das mensagens."""
+
+    def __init__(self, codecs=None, min_bytes: int = COMPRESS_MIN_BYTES):
+        self.codecs = list(codecs) if codecs is not None else available_codecs()
+        self.min_bytes = min_bytes
+        self._by_name = {c.name: c for c in self.codecs}
+
+    @property
+    def accept_encodings(self) -> list:
+        return [c.name for c in self.codecs]
+
+    def choose(self, accepted):
+        """O codec preferido por nós entre os aceitos pelo peer, ou None."""
+        for codec in self.codecs:
+            if codec.name in accepted: return codec
+        return None
+
+    def compress(self, data: bytes, codec) -> tuple:
+        """(dados, nome do codec) — ou (data, "") se `codec` for None, `data` for pequeno ou não encolher."""
+        if codec is None or len(data) < self.min_bytes: return data, ""
+        compressed = codec.compress(data)
+        if len(compressed) >= len(data): return data, ""
+        return compressed, codec.name
+
+    def decompress(self, data: bytes, encoding: str) -> bytes:
+        """Inverso de `compress`. ValueError se o codec for desconhecido ou os dados inválidos."""
+        if not encoding: return data
+        codec = self._by_name.get(encoding)
+        if codec is None: raise ValueError(f"Codec não suportado: {encoding}")
+        try: return codec.decompress(data)
+        except Exception as e: raise ValueError(f"Dados comprimidos inválidos ({encoding}): {e}") from e
+
+    def encode(self, message: chat_pb2.ChatMessage, codec) -> chat_pb2.ChatMessage:
+        """Cópia da mensagem com o texto comprimido, ou a própria mensagem se não compensar."""
+        data, encoding = self.compress(message.text.encode('utf-8'), codec)
+        if not encoding: return message
+        wire = chat_pb2.ChatMessage()
+        wire.CopyFrom(message)
+        wire.text = ""; wire.compressed_text = data; wire.text_encoding = encoding
+        return wire
+
+    def decode(self, message: chat_pb2.ChatMessage) -> chat_pb2.ChatMessage:
+        """Mensagem com o texto descomprimido. ValueError se o codec for desconhecido ou os dados inválidos."""
+        if not message.text_encoding: return message
+        data = self.decompress(message.compressed_text, message.text_encoding)
+        try: text = data.decode('utf-8')
+        except UnicodeDecodeError as e: raise ValueError(f"Texto comprimido inválido ({message.text_encoding}): {e}") from e
+        plain = chat_pb2.ChatMessage()
+        plain.CopyFrom(message)
+        plain.ClearField('compressed_text'); plain.ClearField('text_encoding')
+        plain.text = text
+        return plain
+
+
+def make_compressor(names: str = None, dictionary_path: str = None, min_bytes: int = COMPRESS_MIN_BYTES) -> MessageCompressor:
+    """Monta o compressor a partir das opções de linha de comando.
+
+    `names` é uma lista separada por vírgulas em ordem de preferência ("zstd,gzip"), ou
+    "none" para não comprimir nem aceitar texto comprimido. Sem `names`, usa todos os
+    codecs disponíveis. Com `dictionary_path`, "zstd" inclui também o zstd com dicionário.
+    """
+    dictionary = None
+    if dictionary_path:
+        with open(dictionary_path, 'rb') as f: dictionary = f.read()
+    codecs = available_codecs(dictionary)
+    if names:
+        wanted = [n.strip() for n in names.split(',') if n.strip() and n.strip() != 'none']
+        unknown = [n for n in wanted if n not in ('zstd', 'gzip')]
+        if unknown: raise ValueError(f"Codec desconhecido: {', '.join(unknown)}")
+        if 'zstd' in wanted and zstandard is None: raise RuntimeError("O codec zstd requer `pip install zstandard`.")
+        codecs = [c for n in wanted for c in codecs if c.name.split(':')[0] == n]
+    return MessageCompressor(codecs, min_bytes)
+
+
+def train_dictionary(samples, size: int = DICT_SIZE) -> bytes:
+    """Treina um dicionário zstd com amostras de texto (str ou bytes)."""
+    if zstandard is None: raise RuntimeError("Treinar dicionários requer `pip install zstandard`.")
+    samples = [s.encode('utf-8') if isinstance(s, str) else s for s in samples]
+    return zstandard.train_dictionary(size, samples).as_bytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ferramentas de compressão do chat P2P.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help="Treina um dicionário zstd com mensagens de exemplo (uma por linha).")
+    train.add_argument('samples')
+    train.add_argument('out')
+    train.add_argument('--size', type=int, default=DICT_SIZE)
+    args = parser.parse_args(argv)
+
+    with open(args.samples, encoding='utf-8') as f: samples = [line.rstrip('\n') for line in f if line.strip()]
+    data = train_dictionary(samples, args.size)
+    with open(args.out, 'wb') as f: f.write(data)
+    print(f"Dicionário {ZstdCodec(data).name} com {len(data)} bytes gravado em {args.out} ({len(samples)} amostras).")
+
+
+if __name__ == "__main__":
+    main()
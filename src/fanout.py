@@ -0,0 +1,52 @@
+"""Fan-out com serialização única.
+
+Os stubs gerados serializam o protobuf a cada chamada; mandando a mesma mensagem para N
+peers, são N codificações idênticas. Aqui a mensagem é serializada uma vez e os bytes vão
+prontos para todos os destinatários:
+
+* no cliente, `raw_send_direct_message` cria um callable de SendDirectMessage que recebe
+  a mensagem já serializada (o servidor do peer desserializa normalmente);
+* no servidor, `add_discovery_service` registra o SubscribeToGroupEvents com um
+  serializador identidade: os eventos de grupo, serializados uma vez em `broadcast_event`,
+  vão como bytes para todos os inscritos. O `add_DiscoveryServiceServicer_to_server`
+  gerado não serve para o servidor de descoberta, porque tentaria serializar esses bytes.
+"""
+import grpc
+
+from google.protobuf import empty_pb2
+
+import chat_pb2_grpc
+
+SEND_DIRECT_MESSAGE = '/chat_system.PeerService/SendDirectMessage'
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+def raw_send_direct_message(channel):
+    """SendDirectMessage sobre `channel` recebendo um ChatMessage já serializado."""
+    return channel.unary_unary(SEND_DIRECT_MESSAGE, request_serializer=_identity, response_deserializer=empty_pb2.Empty.FromString)
+
+
+class _HandlerCapture:
+    """Faz as vezes do servidor para `add_*Servicer_to_server` e guarda os handlers gerados."""
+
+    def add_generic_rpc_handlers(self, handlers): pass
+
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        self.service_name, self.method_handlers = service_name, dict(method_handlers)
+
+
+def add_discovery_service(servicer, server):
+    """Registra o DiscoveryService no lugar de `add_DiscoveryServiceServicer_to_server`.
+
+    Os handlers são os gerados, exceto o de SubscribeToGroupEvents, cujas respostas são os
+    eventos já serializados por `broadcast_event` e vão para a stream como estão.
+    """
+    capture = _HandlerCapture()
+    chat_pb2_grpc.add_DiscoveryServiceServicer_to_server(servicer, capture)
+    handlers = capture.method_handlers
+    handlers['SubscribeToGroupEvents'] = handlers['SubscribeToGroupEvents']._replace(response_serializer=_identity)
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(capture.service_name, handlers),))
+    server.add_registered_method_handlers(capture.service_name, handlers)
@@ -0,0 +1,123 @@
+import bisect
+
+import chat_pb2
+from src.vector_clock_manager import VectorClockManager
+
+
+def message_id(message: chat_pb2.ChatMessage) -> tuple:
+    """Identificador da mensagem: remetente (slot e usuário) e o componente do remetente no relógio.
+
+    O usuário entra na chave porque um slot liberado pode ser reocupado por outro membro,
+    cujo relógio recomeça do zero. Peers antigos não mandam o process_id; sem ele não dá
+    para saber qual componente do relógio é o do remetente, e a chave usa o relógio inteiro.
+    """
+    clock = message.vector_clock.clock
+    if not message.HasField('process_id'): return None, message.user_id, tuple(clock)
+    return message.process_id, message.user_id, clock[message.process_id] if message.process_id < len(clock) else 0
+
+
+class HistoryStore:
+    """Histórico do grupo em ordem causal determinística, indexado por (remetente, relógio).
+
+    A ordem é a de `VectorClockManager.causal_keys` com o process_id como desempate, igual
+    em todos os peers. `add`/`extend` descartam duplicatas em O(1) pelo índice e inserem na
+    posição ordenada (as mensagens chegam quase sempre no fim, então a inserção é barata).
+    Quando o histórico passa de `max_messages` ou de `max_bytes` (tamanho serializado), as
+    mais antigas na ordem são descartadas. Para cada remetente guarda-se o maior relógio já
+    descartado: uma mensagem mais antiga que isso é considerada velha (`is_stale`). Mensagens
+    sem process_id não entram nessa conta.
+
+    Não é thread-safe; o cliente usa o store sob o próprio lock.
+    """
+
+    def __init__(self, max_messages: int = None, max_bytes: int = None):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self._keys = []
+        self._messages = []
+        self._index = {}
+        self._evicted = {}
+        self.nbytes = 0
+
+    def __len__(self): return len(self._messages)
+    def __iter__(self): return iter(list(self._messages))
+
+    def __contains__(self, mid: tuple) -> bool:
+        return mid in self._index
+
+    def is_stale(self, message: chat_pb2.ChatMessage) -> bool:
+        """Mais antiga que a última mensagem descartada do mesmo remetente (e fora do índice)."""
+        sender_slot, sender, seq = mid = message_id(message)
+        if sender_slot is None: return False
+        return mid not in self._index and seq <= self._evicted.get((sender_slot, sender), -1)
+
+    def seen(self, message: chat_pb2.ChatMessage) -> bool:
+        return message_id(message) in self._index or self.is_stale(message)
+
+    def get(self, mid: tuple):
+        return self._index.get(mid)
+
+    def add(self, message: chat_pb2.ChatMessage) -> bool:
+        """Insere a mensagem na ordem. Devolve False se ela já tinha sido vista."""
+        return bool(self.extend([message]))
+
+    def extend(self, messages) -> list:
+        """Insere um lote em ordem causal; devolve as mensagens novas, na ordem do histórico."""
+        fresh, ids = [], set()
+        for message in messages:
+            mid = message_id(message)
+            if mid in ids or self.seen(message): continue
+            ids.add(mid); fresh.append(message)
+        if not fresh: return []
+
+        keys = [tuple(k) for k in VectorClockManager.causal_keys([m.vector_clock for m in fresh], [m.process_id for m in fresh]).tolist()]
+        order = sorted(range(len(fresh)), key=keys.__getitem__)
+        fresh = [fresh[i] for i in order]
+        for i, message in zip(order, fresh):
+            key = keys[i]
+            if not self._keys or key >= self._keys[-1]:
+                self._keys.append(key); self._messages.append(message)
+            else:
+                pos = bisect.bisect_right(self._keys, key)
+                self._keys.insert(pos, key); self._messages.insert(pos, message)
+            self._index[message_id(message)] = message
+            self.nbytes += message.ByteSize()
+        self._evict()
+        return fresh
+
+    def _evict(self):
+        count = 0
+        while count < len(self._messages) and ((self.max_messages is not None and len(self._messages) - count > self.max_messages)
+                                               or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            message = self._messages[count]
+            sender_slot, sender, seq = mid = message_id(message)
+            del self._index[mid]
+            if sender_slot is not None:
+                self._evicted[(sender_slot, sender)] = max(seq, self._evicted.get((sender_slot, sender), -1))
+            self.nbytes -= message.ByteSize()
+            count += 1
+        if count:
+            del self._keys[:count]; del self._messages[:count]
+
+    def range(self, start: tuple = None, stop: tuple = None):
+        """Mensagens com `start` <= chave < `stop`, em ordem (limites None são abertos).
+
+        A chave é (soma do relógio, process_id), como em `VectorClockManager.causal_keys`.
+        """
+        lo = 0 if start is None else bisect.bisect_left(self._keys, start)
+        hi = len(self._keys) if stop is None else bisect.bisect_left(self._keys, stop)
+        return self._messages[lo:hi]
+
+    def tail(self, k: int, max_bytes: int = None) -> list:
+        """As `k` mensagens mais recentes na ordem, somando no máximo `max_bytes` serializados."""
+        out = self._messages[-k:] if k > 0 else []
+        if max_bytes is None: return out
+        size = 0
+        for i in range(len(out) - 1, -1, -1):
+            size += out[i].ByteSize()
+            if size > max_bytes: return out[i + 1:]
+        return out
+
+    def clear(self):
+        self._keys.clear(); self._messages.clear(); self._index.clear(); self._evicted.clear()
+        self.nbytes = 0
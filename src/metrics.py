@@ -0,0 +1,271 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+import chat_pb2
+
+# Limites em segundos; cobrem de espera de lock (µs) até RPCs lentas.
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock: self.value += amount
+
+
+class Histogram:
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0; self.sum = 0.0; self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1; self.sum += value
+            if value > self.max: self.max = value
+
+
+class _NoOp:
+    """Métrica nula devolvida quando o registro está desligado."""
+    def inc(self, amount: float = 1): pass
+    def observe(self, value: float): pass
+
+
+_NOOP = _NoOp()
+
+
+class InstrumentedLock:
+    """Envolve um Lock/RLock medindo espera e posse.
+
+    Em RLocks, só a aquisição mais externa de cada thread é medida; reentradas não
+    contam como espera nem reiniciam o tempo de posse.
+    """
+
+    def __init__(self, lock, wait_hist: Histogram, hold_hist: Histogram):
+        self._lock = lock
+        self._wait = wait_hist; self._hold = hold_hist
+        self._local = threading.local()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        depth = getattr(self._local, 'depth', 0)
+        if depth:
+            ok = self._lock.acquire(blocking, timeout)
+            if ok: self._local.depth = depth + 1
+            return ok
+        start = time.perf_counter()
+        ok = self._lock.acquire(blocking, timeout)
+        if ok:
+            acquired = time.perf_counter()
+            self._wait.observe(acquired - start)
+            self._local.depth = 1; self._local.acquired = acquired
+        return ok
+
+    def release(self):
+        depth = self._local.depth - 1
+        self._local.depth = depth
+        if depth == 0: self._hold.observe(time.perf_counter() - self._local.acquired)
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _escape_label(value) -> str:
+    """Escapa um valor de rótulo no formato texto do Prometheus (\\, aspas e quebra de linha)."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """Contadores, histogramas e gauges nomeados, com rótulos.
+
+    Desligado, `counter`/`histogram` devolvem uma métrica nula e `lock` devolve o próprio
+    lock recebido, de modo que a instrumentação custa só a chamada do método.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counters = {}; self._histograms = {}; self._gauges = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, **labels):
+        if not self.enabled: return _NOOP
+        key = _key(name, labels)
+        metric = self._counters.get(key)
+        if metric is None:
+            with self._lock: metric = self._counters.setdefault(key, Counter())
+        return metric
+
+    def histogram(self, name: str, **labels):
+        if not self.enabled: return _NOOP
+        key = _key(name, labels)
+        metric = self._histograms.get(key)
+        if metric is None:
+            with self._lock: metric = self._histograms.setdefault(key, Histogram())
+        return metric
+
+    def register_gauge(self, name: str, fn, **labels):
+        """Registra uma função lida a cada coleta (ex.: o tamanho de uma fila)."""
+        if not self.enabled: return
+        with self._lock: self._gauges[_key(name, labels)] = fn
+
+    def unregister_gauge(self, name: str, **labels):
+        if not self.enabled: return
+        with self._lock: self._gauges.pop(_key(name, labels), None)
+
+    def lock(self, lock, name: str, **labels):
+        if not self.enabled: return lock
+        return InstrumentedLock(lock, self.histogram(f"{name}_wait_seconds", **labels), self.histogram(f"{name}_hold_seconds", **labels))
+
+    def _collect(self):
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+            gauges = list(self._gauges.items())
+        gauge_values = []
+        for key, fn in gauges:
+            try: gauge_values.append((key, float(fn())))
+            except Exception: pass
+        return [(k, c.value) for k, c in counters], gauge_values, histograms
+
+    def to_proto(self) -> chat_pb2.StatsResponse:
+        res = chat_pb2.StatsResponse(enabled=self.enabled)
+        if not self.enabled: return res
+        counters, gauges, histograms = self._collect()
+        for (name, labels), value in counters: res.counters.add(name=name, labels=dict(labels), value=value)
+        for (name, labels), value in gauges: res.gauges.add(name=name, labels=dict(labels), value=value)
+        for (name, labels), h in histograms:
+            with h._lock:
+                res.histograms.add(name=name, labels=dict(labels), count=h.count, sum=h.sum, max=h.max,
+                                   bucket_bounds=h.bounds, bucket_counts=h.counts)
+        return res
+
+    def to_prometheus(self) -> str:
+        """Exporta no formato texto do Prometheus."""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items: return ""
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in items) + "}"
+
+        lines = []
+        counters, gauges, histograms = self._collect()
+        for (name, labels), value in counters: lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), value in gauges: lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), h in histograms:
+            with h._lock:
+                cumulative = 0
+                for bound, count in zip(h.bounds, h.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+class ServerMetricsInterceptor(grpc.ServerInterceptor):
+    """Mede a latência de cada RPC atendida (para streams, a duração da stream)."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None: return None
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        errors = self.registry.counter('rpc_server_errors_total', method=method)
+
+        if handler.unary_unary:
+            latency = self.registry.histogram('rpc_server_latency_seconds', method=method)
+            inner = handler.unary_unary
+            def unary_unary(request, context):
+                start = time.perf_counter()
+                try: return inner(request, context)
+                except Exception: errors.inc(); raise
+                finally: latency.observe(time.perf_counter() - start)
+            return handler._replace(unary_unary=unary_unary)
+
+        if handler.unary_stream:
+            duration = self.registry.histogram('rpc_server_stream_seconds', method=method)
+            inner = handler.unary_stream
+            def unary_stream(request, context):
+                start = time.perf_counter()
+                try: yield from inner(request, context)
+                except Exception: errors.inc(); raise
+                finally: duration.observe(time.perf_counter() - start)
+            return handler._replace(unary_stream=unary_stream)
+
+        return handler
+
+
+class ClientMetricsInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """Mede a latência das RPCs feitas por um canal (para streams, a duração da stream)."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    def _observe(self, method, start):
+        latency = self.registry.histogram('rpc_client_latency_seconds', method=method)
+        errors = self.registry.counter('rpc_client_errors_total', method=method)
+        def done(call):
+            latency.observe(time.perf_counter() - start)
+            if call.code() != grpc.StatusCode.OK: errors.inc()
+        return done
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        start = time.perf_counter()
+        call = continuation(client_call_details, request)
+        call.add_done_callback(self._observe(client_call_details.method.rsplit('/', 1)[-1], start))
+        return call
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        start = time.perf_counter()
+        call = continuation(client_call_details, request)
+        call.add_done_callback(self._observe(client_call_details.method.rsplit('/', 1)[-1], start))
+        return call
+
+
+def instrument_channel(channel, registry: MetricsRegistry):
+    if not registry.enabled: return channel
+    return grpc.intercept_channel(channel, ClientMetricsInterceptor(registry))
+
+
+def server_interceptors(registry: MetricsRegistry) -> list:
+    return [ServerMetricsInterceptor(registry)] if registry.enabled else []
+
+
+def start_prometheus_server(registry: MetricsRegistry, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve `registry` em http://host:port/metrics numa thread daemon."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404); return
+            body = registry.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args): pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
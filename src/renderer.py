@@ -0,0 +1,131 @@
+import logging
+import queue
+import sys
+import threading
+import time
+
+DEFAULT_MAX_FPS = 20
+DEFAULT_MAX_QUEUE = 10000
+
+_PROMPT = object()
+_STOP = object()
+
+
+class ConsoleRenderer:
+    """Desenha a saída do cliente numa thread própria.
+
+    As threads de rede só enfileiram eventos de exibição; esta thread junta tudo o que
+    estiver pendente e escreve no terminal no máximo `max_fps` vezes por segundo, com um
+    único write por quadro. Se a fila encher, os eventos excedentes são descartados e
+    contabilizados, em vez de bloquear quem produziu a mensagem.
+    """
+
+    def __init__(self, prompt_fn=None, max_fps: int = DEFAULT_MAX_FPS, max_queue: int = DEFAULT_MAX_QUEUE, stream=None):
+        if max_fps <= 0:
+            raise ValueError("max_fps deve ser positivo")
+        self._prompt_fn = prompt_fn or (lambda: "")
+        self._frame_interval = 1.0 / max_fps
+        self._stream = stream or sys.stdout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._at_prompt = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        if self._thread is None: return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def show(self, text: str):
+        """Enfileira uma linha para exibição. Nunca bloqueia."""
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            with self._dropped_lock: self._dropped += 1
+
+    def prompt(self):
+        """Pede que o prompt seja redesenhado no próximo quadro."""
+        try:
+            self._queue.put_nowait(_PROMPT)
+        except queue.Full:
+            pass
+
+    def flush(self, timeout: float = 1.0):
+        """Espera até que tudo o que foi enfileirado antes desta chamada tenha sido escrito."""
+        if self._thread is None: return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try: items.append(self._queue.get_nowait())
+                except queue.Empty: break
+
+            lines, want_prompt, stop, waiters = [], False, False, []
+            for item in items:
+                if item is _STOP: stop = True
+                elif item is _PROMPT: want_prompt = True
+                elif isinstance(item, threading.Event): waiters.append(item)
+                else: lines.append(item)
+
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                lines.append(f"[Sistema] {dropped} eventos omitidos da tela.")
+
+            self._write_frame(lines, want_prompt)
+            for w in waiters: w.set()
+            if stop: return
+            time.sleep(self._frame_interval)
+
+    def _write_frame(self, lines: list, want_prompt: bool):
+        if not lines and not want_prompt: return
+        out = []
+        if lines:
+            if self._at_prompt: out.append("\n")
+            out.append("\n".join(lines))
+            out.append("\n")
+            # Linhas assíncronas apagam visualmente o prompt; redesenha se ele estava na tela.
+            want_prompt = want_prompt or self._at_prompt
+        if want_prompt:
+            out.append(f"{self._prompt_fn()} > ")
+        self._at_prompt = want_prompt
+        try:
+            self._stream.write("".join(out))
+            self._stream.flush()
+        except (OSError, ValueError):
+            pass
+
+
+class NullRenderer:
+    """Renderer silencioso, para modo headless: descarta todos os eventos."""
+
+    def start(self): pass
+    def stop(self, timeout: float = 1.0): pass
+    def show(self, text: str): pass
+    def prompt(self): pass
+    def flush(self, timeout: float = 1.0): pass
+
+
+class RendererLogHandler(logging.Handler):
+    """Encaminha registros de log para o renderer, sem escrever direto no terminal."""
+
+    def __init__(self, renderer, level=logging.NOTSET):
+        super().__init__(level)
+        self.renderer = renderer
+
+    def emit(self, record):
+        try:
+            self.renderer.show(self.format(record))
+        except Exception:
+            self.handleError(record)
@@ -0,0 +1,28 @@
+from google.protobuf.message import DecodeError
+
+import chat_pb2
+from src.compression import MessageCompressor
+
+# Quantas mensagens um snapshot leva por padrão (e no máximo).
+SNAPSHOT_MESSAGES = 50
+# Teto das mensagens do snapshot em bytes serializados, bem abaixo do limite de 4 MB por mensagem do gRPC.
+SNAPSHOT_MAX_BYTES = 1 << 20
+
+
+def build_snapshot(group_id: str, clock: list, messages: list, members: list, compressor: MessageCompressor,
+                   accept_encodings) -> chat_pb2.GroupSnapshot:
+    """Monta o snapshot: relógio, as mensagens num único blob e a lista de membros.
+
+    O blob é comprimido com o codec preferido entre os que quem pediu aceita.
+    """
+    raw = chat_pb2.ChatHistory(messages=messages).SerializeToString()
+    blob, encoding = compressor.compress(raw, compressor.choose(accept_encodings))
+    return chat_pb2.GroupSnapshot(group_id=group_id, vector_clock=chat_pb2.VectorClock(clock=clock), history=blob,
+                                  history_encoding=encoding, history_count=len(messages), members=members)
+
+
+def snapshot_messages(snapshot: chat_pb2.GroupSnapshot, compressor: MessageCompressor) -> list:
+    """Descomprime o histórico do snapshot. ValueError se a codificação ou os dados forem inválidos."""
+    raw = compressor.decompress(snapshot.history, snapshot.history_encoding)
+    try: return list(chat_pb2.ChatHistory.FromString(raw).messages)
+    except DecodeError as e: raise ValueError(f"Histórico do snapshot inválido: {e}") from e
@@ -0,0 +1,217 @@
+"""Analisador offline de traces gravados com `src.causal_trace.TraceWriter`.
+
+Uso (a partir da raiz do projeto):
+    python -m src.trace_analyzer traces/*.vctr [--json] [--strict]
+
+Os arquivos são agrupados pelo group_id do cabeçalho e cada grupo é analisado em separado,
+já que os IDs de processo só fazem sentido dentro de um grupo.
+
+Para cada entrega de uma mensagem m do remetente s no processo i, conta-se quantos
+envios de cada processo k são causalmente anteriores a m (busca binária no índice de
+envios de k pelo componente m.clock[k]) e compara-se com quantos envios de k o processo
+i já tinha entregue. Faltar algum é violação de ordem causal. O trace é lido em blocos,
+e cada bloco é verificado com operações vetoriais do NumPy.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from src.causal_trace import DELIVER, SEND, SYNC, read_header
+
+DEFAULT_CHUNK = 1 << 16
+MAX_EXAMPLES = 20
+
+
+def record_dtype(num_processes: int) -> np.dtype:
+    return np.dtype([('kind', 'u1'), ('recorder', 'u1'), ('sender', 'u1'), ('time_ns', '<i8'), ('clock', '<u4', (num_processes,))])
+
+
+def open_trace(path: str):
+    """Mapeia o trace em memória sem carregá-lo. Um registro final incompleto é ignorado."""
+    num_processes, group_id, header_size = read_header(path)
+    dtype = record_dtype(num_processes)
+    count = (os.path.getsize(path) - header_size) // dtype.itemsize
+    if count <= 0: return np.empty(0, dtype=dtype), num_processes, group_id
+    return np.memmap(path, dtype=dtype, mode='r', offset=header_size, shape=(count,)), num_processes, group_id
+
+
+def _chunks(records, chunk_size):
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
+
+
+class SendIndex:
+    """Para cada processo k, os valores ordenados de clock[k] nos envios de k."""
+
+    def __init__(self, per_sender: list):
+        self.per_sender = per_sender
+
+    def ranks(self, clocks: np.ndarray) -> np.ndarray:
+        """R[i, k] = número de envios de k com clock[k] <= clocks[i, k]."""
+        out = np.zeros(clocks.shape, dtype=np.int64)
+        for k, values in enumerate(self.per_sender):
+            if len(values): out[:, k] = np.searchsorted(values, clocks[:, k], side='right')
+        return out
+
+
+def build_send_index(traces, num_processes, chunk_size):
+    """Primeira passada: índice de envios e anomalias de envio."""
+    collected = [[] for _ in range(num_processes)]
+    non_monotonic = 0
+    for records in traces:
+        last = -1
+        for chunk in _chunks(records, chunk_size):
+            sends = chunk[(chunk['kind'] == SEND) & (chunk['sender'] == chunk['recorder'])]
+            if not len(sends): continue
+            own = sends['clock'][np.arange(len(sends)), sends['sender']].astype(np.int64)
+            # O componente próprio do remetente precisa crescer a cada envio.
+            non_monotonic += int(np.count_nonzero(np.diff(np.concatenate(([last], own))) <= 0))
+            last = own[-1]
+            for k in np.unique(sends['sender']):
+                collected[k].append(own[sends['sender'] == k])
+
+    per_sender, duplicate_ids = [], 0
+    for parts in collected:
+        values = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        duplicate_ids += int(np.count_nonzero(np.diff(values) == 0))
+        per_sender.append(values)
+    return SendIndex(per_sender), {'non_monotonic_sends': non_monotonic, 'duplicate_send_ids': duplicate_ids}
+
+
+class _RecorderState:
+    def __init__(self, num_processes):
+        self.delivered = np.zeros(num_processes, dtype=np.int64)   # maior posto entregue, por remetente
+        self.last_send = None                                     # relógio do último envio próprio
+
+
+def _check_segment(seg, state, index, report, max_examples):
+    clocks = seg['clock'].astype(np.int64)
+    kinds = seg['kind']
+    recorder = int(seg['recorder'][0])
+    n = clocks.shape[1]
+
+    own_sends = (kinds == SEND) & (seg['sender'] == seg['recorder'])
+    last_send_row = np.maximum.accumulate(np.where(own_sends, np.arange(len(seg)), -1))
+    delivery_rows = np.nonzero(kinds == DELIVER)[0]
+
+    if len(delivery_rows):
+        D = clocks[delivery_rows]
+        s = seg['sender'][delivery_rows].astype(np.int64)
+        m = len(delivery_rows)
+        rows = np.arange(m)
+        R = index.ranks(D)
+        own = R[rows, s]
+
+        # Entrega sem envio correspondente no trace do remetente.
+        unmatched = np.zeros(m, dtype=bool)
+        for k in np.unique(s):
+            values = index.per_sender[k]
+            if not len(values): continue
+            sel = s == k
+            pos = own[sel]
+            ok = (pos > 0) & (values[np.maximum(pos - 1, 0)] == D[sel, k])
+            unmatched[sel] = ~ok
+        own = np.where(unmatched, 0, own)
+
+        H = np.zeros((m, n), dtype=np.int64)
+        H[rows, s] = own
+        acc = np.maximum.accumulate(np.vstack([state.delivered, H]), axis=0)
+        before = acc[:-1]
+        state.delivered = acc[-1]
+
+        others = np.ones((m, n), dtype=bool)
+        others[rows, s] = False
+        others[:, recorder] = False
+        missing = (R > before) & others
+        before_s = before[rows, s]
+        matched = ~unmatched
+        gap = matched & (own > before_s + 1)
+        duplicate = matched & (own <= before_s)
+        violation = missing.any(axis=1) | gap
+
+        report['causal_violations'] += int(np.count_nonzero(violation))
+        report['duplicate_deliveries'] += int(np.count_nonzero(duplicate))
+        report['unmatched_deliveries'] += int(np.count_nonzero(unmatched))
+
+        # Concorrência com o último envio do próprio processo: nenhum dos dois viu o outro.
+        li = last_send_row[delivery_rows]
+        has_local = li >= 0
+        L = np.where(has_local[:, None], clocks[np.maximum(li, 0)], 0)
+        if state.last_send is not None:
+            L = np.where(has_local[:, None], L, state.last_send)
+            has_local = np.ones(m, dtype=bool)
+        concurrent = has_local & ~(L <= D).all(axis=1) & ~(D <= L).all(axis=1)
+        report['concurrent_deliveries'] += int(np.count_nonzero(concurrent))
+
+        for i in np.nonzero(violation)[0][:max(0, max_examples - len(report['examples']))]:
+            lacking = {int(k): int(R[i, k] - before[i, k]) for k in np.nonzero(missing[i])[0]}
+            if gap[i]: lacking[int(s[i])] = int(own[i] - before_s[i] - 1)
+            report['examples'].append({'recorder': recorder, 'sender': int(s[i]), 'time_ns': int(seg['time_ns'][delivery_rows[i]]),
+                                       'clock': D[i].tolist(), 'missing_from': lacking})
+
+    if own_sends.any(): state.last_send = clocks[np.nonzero(own_sends)[0][-1]]
+
+
+def analyze_group(traces, num_processes: int, chunk_size: int = DEFAULT_CHUNK, max_examples: int = MAX_EXAMPLES) -> dict:
+    index, send_anomalies = build_send_index(traces, num_processes, chunk_size)
+    report = {'files': len(traces), 'events': int(sum(len(t) for t in traces)), 'sends': int(sum(len(v) for v in index.per_sender)),
+              'deliveries': 0, 'syncs': 0, 'causal_violations': 0, 'duplicate_deliveries': 0, 'unmatched_deliveries': 0,
+              'concurrent_deliveries': 0, **send_anomalies, 'examples': []}
+
+    for records in traces:
+        state = _RecorderState(num_processes)
+        for chunk in _chunks(records, chunk_size):
+            kinds = chunk['kind']
+            report['deliveries'] += int(np.count_nonzero(kinds == DELIVER))
+            sync_rows = np.nonzero(kinds == SYNC)[0]
+            report['syncs'] += len(sync_rows)
+            start = 0
+            for row in list(sync_rows) + [len(chunk)]:
+                if row > start: _check_segment(chunk[start:row], state, index, report, max_examples)
+                if row < len(chunk):
+                    synced = index.ranks(chunk['clock'][row:row + 1].astype(np.int64))[0]
+                    state.delivered = np.maximum(state.delivered, synced)
+                start = row + 1
+    return report
+
+
+def analyze(paths, chunk_size: int = DEFAULT_CHUNK, max_examples: int = MAX_EXAMPLES) -> dict:
+    """Analisa os traces por grupo e devolve {group_id: relatório}."""
+    if not paths: raise ValueError("Nenhum trace informado.")
+    groups = {}
+    for path in paths:
+        records, n, group_id = open_trace(path)
+        traces, num_processes = groups.setdefault(group_id, ([], n))
+        if n != num_processes: raise ValueError(f"{path}: {n} processos, esperado {num_processes}")
+        traces.append(records)
+    return {group_id: analyze_group(traces, n, chunk_size, max_examples) for group_id, (traces, n) in groups.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica ordem causal em traces de relógios vetoriais.")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK)
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório completo em JSON.")
+    parser.add_argument('--strict', action='store_true', help="Sai com código 1 se houver violações ou anomalias.")
+    args = parser.parse_args(argv)
+
+    reports = analyze(args.paths, chunk_size=args.chunk_size)
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for group_id, report in reports.items():
+            print(f"== grupo '{group_id}' ==")
+            for key, value in report.items():
+                if key != 'examples': print(f"{key}: {value}")
+            for ex in report['examples']:
+                print(f"  violação: processo {ex['recorder']} entregou msg de {ex['sender']} {ex['clock']} sem {ex['missing_from']}")
+    anomalies = sum(r['causal_violations'] + r['duplicate_deliveries'] + r['unmatched_deliveries']
+                    + r['duplicate_send_ids'] + r['non_monotonic_sends'] for r in reports.values())
+    if args.strict and anomalies: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
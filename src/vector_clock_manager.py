@@ -1,5 +1,38 @@
+import logging
+import numpy as np
 from chat_pb2 import VectorClock
 
+# Rastreamento do relógio fica em DEBUG; desligado, cada evento custa só um isEnabledFor.
+_log = logging.getLogger(__name__)
+# Sem handler próprio, avisos iriam para o stderr (logging.lastResort), quebrando os modos
+# sem terminal; quem quiser ver os logs anexa um handler (o CLI usa o RendererLogHandler).
+_log.addHandler(logging.NullHandler())
+
+# Limite de elementos da matriz intermediária (linhas x lote x processos) nas comparações em lote.
+_COMPARE_BLOCK_ELEMENTS = 1 << 22
+
+
+def clocks_to_array(clocks, width: int = None) -> np.ndarray:
+    """Empilha relógios (listas, VectorClock ou uma matriz) numa matriz int64, completando com zeros."""
+    if isinstance(clocks, np.ndarray):
+        arr = np.asarray(clocks, dtype=np.int64)
+        if arr.ndim != 2: raise ValueError("Esperada uma matriz (lote x processos)")
+    else:
+        rows = [c.clock if isinstance(c, VectorClock) else c for c in clocks]
+        try:
+            arr = np.array(rows, dtype=np.int64)
+        except ValueError:
+            arr = None
+        if arr is None or arr.ndim != 2:
+            # Lote vazio ou relógios de tamanhos diferentes.
+            cols = max((len(r) for r in rows), default=0)
+            arr = np.zeros((len(rows), cols), dtype=np.int64)
+            for i, r in enumerate(rows): arr[i, :len(r)] = list(r)
+    if width is not None and arr.shape[1] < width:
+        arr = np.pad(arr, ((0, 0), (0, width - arr.shape[1])))
+    return arr
+
+
 class VectorClockManager:
     def __init__(self, process_id: int, num_processes: int):
         if not (0 <= process_id < num_processes):
@@ -7,25 +40,30 @@ class VectorClockManager:
 
         self.process_id = process_id
         self.clock = [0] * num_processes
-        print(f"Processo {self.process_id}: Relógio inicializado como {self.clock}")
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("Processo %d: Relógio inicializado como %s", self.process_id, self.clock)
     	
      #aumenta o relogio 
     def increment(self):
         self.clock[self.process_id] += 1
-        print(f"Processo {self.process_id}: Relógio incrementado para {self.clock}")
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("Processo %d: Relógio incrementado para %s", self.process_id, self.clock)
 
     #atualia o relogio
     def update(self, received_clock_list: list[int]):
         if len(received_clock_list) > len(self.clock):
             diff = len(received_clock_list) - len(self.clock)
             self.clock.extend([0] * diff)
-            print(f"Processo {self.process_id}: Relógio expandido para {self.clock}")
+            if _log.isEnabledFor(logging.DEBUG):
+                _log.debug("Processo %d: Relógio expandido para %s", self.process_id, self.clock)
 
         elif len(received_clock_list) < len(self.clock):
-            print(f"Processo {self.process_id}: Aviso - relógio recebido menor que esperado. Esperado: {len(self.clock)}, Recebido: {len(received_clock_list)}")
+            _log.warning("Processo %d: Aviso - relógio recebido menor que esperado. Esperado: %d, Recebido: %d",
+                         self.process_id, len(self.clock), len(received_clock_list))
             return
 
-        print(f"Processo {self.process_id}: Antes da atualização com {received_clock_list}, relógio local é {self.clock}")
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("Processo %d: Antes da atualização com %s, relógio local é %s", self.process_id, received_clock_list, self.clock)
         for i in range(len(received_clock_list)):
             self.clock[i] = max(self.clock[i], received_clock_list[i])
 
@@ -55,5 +93,56 @@ class VectorClockManager:
         for i in range(len(other_clock)):
             self.clock[i] = max(self.clock[i], other_clock[i])
 
+    def merge_batch(self, clocks):
+        """Equivale a chamar merge_with_max para cada relógio do lote, numa única redução."""
+        batch = clocks_to_array(clocks)
+        if batch.size == 0: return
+        if batch.shape[1] > len(self.clock):
+            self.clock.extend([0] * (batch.shape[1] - len(self.clock)))
+        top = batch.max(axis=0)
+        merged = np.maximum(np.asarray(self.clock[:len(top)], dtype=np.int64), top)
+        self.clock[:len(top)] = merged.tolist()
+
+    @staticmethod
+    def causal_relations(clocks):
+        """Relações entre todos os pares de um lote.
+
+        Devolve (before, concurrent), matrizes booleanas k x k: before[i, j] indica que o
+        relógio i aconteceu antes do j; concurrent[i, j], que nenhum aconteceu antes do outro
+        (relógios iguais não contam como concorrentes).
+        """
+        batch = clocks_to_array(clocks)
+        k, n = batch.shape
+        le = np.empty((k, k), dtype=bool)
+        step = max(1, _COMPARE_BLOCK_ELEMENTS // max(1, k * n))
+        for start in range(0, k, step):
+            le[start:start + step] = (batch[start:start + step, None, :] <= batch[None, :, :]).all(axis=2)
+        before = le & ~le.T
+        concurrent = ~le & ~le.T
+        return before, concurrent
+
+    @staticmethod
+    def happened_before_matrix(clocks) -> np.ndarray:
+        return VectorClockManager.causal_relations(clocks)[0]
+
+    @staticmethod
+    def causal_keys(clocks, tie_breaker=None) -> np.ndarray:
+        """Chave de ordenação causal de cada relógio do lote: matriz k x 2 com (soma, desempate).
+
+        Se a aconteceu antes de b, a soma dos componentes de a é estritamente menor que a de b,
+        então ordenar pela soma respeita a causalidade. Empates (concorrentes ou iguais) são
+        desfeitos por `tie_breaker` (ex.: o process_id do remetente), o que torna a ordem
+        total e igual em todos os peers.
+        """
+        batch = clocks_to_array(clocks)
+        ties = np.zeros(len(batch), dtype=np.int64) if tie_breaker is None else np.asarray(tie_breaker, dtype=np.int64)
+        return np.column_stack((batch.sum(axis=1), ties))
+
+    @staticmethod
+    def causal_order(clocks, tie_breaker=None) -> np.ndarray:
+        """Índices do lote ordenados por `causal_keys` (empates restantes pela posição)."""
+        keys = VectorClockManager.causal_keys(clocks, tie_breaker)
+        return np.lexsort((keys[:, 1], keys[:, 0]))
+
     def __str__(self):
         return f"Processo {self.process_id} Clock: {self.clock}"